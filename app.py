@@ -1,12 +1,18 @@
-from dotenv import load_dotenv
-load_dotenv()
+import json
 
 import streamlit as st
+from checkpoints import CHECKPOINT_TOPICS, CURRICULUM
+from backend.prompts import EXPLAIN, QUIZ, RELEVANCE, RETEACH
+from backend.topics import canonical_topic
+from content_store import ContentStore, digest
+from graph import CurriculumGraph, PrefetchPlanner
+from learning_session import LearningGraph, SQLiteCheckpointer
 from context_manager import (
     get_context,
     generate_mcqs,
     feynman_explanation,
     compute_relevance_score,
+    is_fallback,
 )
 
 # -----------------------------
@@ -91,18 +97,6 @@ st.markdown(
 # =============================
 # UPDATED UI: checkpoint-based selection + free search (mutually exclusive)
 # =============================
-CHECKPOINT_TOPICS = [
-    "Artificial Intelligence",
-    "Machine Learning",
-    "Deep Learning",
-    "Natural Language Processing",
-    "Computer Vision",
-    "Reinforcement Learning",
-    "Data Structures and Algorithms",
-    "Cloud Computing",
-    "Distributed Systems",
-    "Cybersecurity Basics",
-]
 CHECKPOINT_PLACEHOLDER = "Please select a checkpoint topic"
 
 # Track which input the user is actively using
@@ -156,61 +150,182 @@ elif checkpoint_value != CHECKPOINT_PLACEHOLDER:
 
 st.caption("Select a topic to start learning.")
 
-if "stage" not in st.session_state:
-    st.session_state.stage = "start"
-
-if "score" not in st.session_state:
-    st.session_state.score = None
+# =============================
+# UPDATED: quiz attempts (max 3 tries with re-explain + re-quiz)
+# =============================
+MAX_ATTEMPTS = 3
 
-# Track the active topic to keep the LangGraph-like flow deterministic
-if "topic" not in st.session_state:
-    st.session_state.topic = ""
 
 # =============================
-# UPDATED: state for MCQ evaluation
+# Cached generation (shared across reruns and sessions)
 # =============================
-if "explanation" not in st.session_state:
-    st.session_state.explanation = ""
-if "simple_explanation" not in st.session_state:
-    st.session_state.simple_explanation = ""
-if "mcqs" not in st.session_state:
-    st.session_state.mcqs = []
+# Streamlit re-executes this script on every widget interaction, so every LLM
+# call goes through one process-wide ContentStore keyed by topic, difficulty
+# and source text. Reruns then cost zero tokens and render instantly; fallback
+# content (API missing, rate-limited, provider error) is only kept for a minute.
+@st.cache_resource
+def _content_store() -> ContentStore:
+    return ContentStore(is_fallback=is_fallback)
+
+
+def _generate_mcqs(topic, source_text, difficulty):
+    # Backward-compatible call (in case Streamlit server has an older function loaded)
+    try:
+        return generate_mcqs(topic, context_text=source_text, difficulty=difficulty)
+    except TypeError:
+        # Fallback: generate without context constraint (requires server restart to pick up new signature)
+        return generate_mcqs(topic)
+
+
+# Resolved once per script run; background prefetch threads use this object directly
+# (they have no Streamlit script context to call st.cache_resource from).
+store = _content_store()
+
+
+# Keys carry the prompt template version, so content made with an edited prompt is never served.
+def _context_key(topic):
+    # canonical key: "ML", "machine learning" and "What is Machine Learning?" share one generation
+    return ("context", EXPLAIN.version, canonical_topic(topic))
+
+
+def cached_context(topic):
+    return store.get(_context_key(topic), get_context, topic)
+
+
+def cached_mcqs(topic, source_text, difficulty, attempt):
+    """MCQs for one attempt; the attempt number keeps retries from repeating the same quiz."""
+    key = ("mcqs", QUIZ.version, canonical_topic(topic), difficulty, digest(source_text), attempt)
+    return store.get(key, _generate_mcqs, topic, source_text, difficulty)
 
-if "mcq_answers" not in st.session_state:
-    # stores selected option index for each question (0..3) or None
-    st.session_state.mcq_answers = {}
 
-if "relevance_score" not in st.session_state:
-    st.session_state.relevance_score = None
+def _relevance_key(explanation, mcqs):
+    return ("relevance", RELEVANCE.version, digest(explanation), digest(json.dumps(mcqs, sort_keys=True)))
+
+
+def start_relevance(sess):
+    """Score relevance in the background so the quiz can render as soon as the MCQs exist."""
+    # foreground pool: the learner sees this score, so it must not wait behind speculative prefetches
+    store.start(
+        _relevance_key(sess.relevance_source, sess.mcqs), compute_relevance_score, sess.relevance_source, sess.mcqs
+    )
+
+
+def poll_relevance():
+    """Fill in relevance_score once the background scoring has finished."""
+    sess = st.session_state.learning
+    if sess.relevance_score is not None or not sess.mcqs:
+        return sess.relevance_score
+    future = store.peek(_relevance_key(sess.relevance_source, sess.mcqs))
+    if future is None:
+        # failed, evicted or resumed in a new process: start over
+        start_relevance(sess)
+    elif future.done() and future.exception() is None:
+        learning.set_relevance(sess, future.result())
+    return sess.relevance_score
+
+
+def cached_feynman(topic, attempt):
+    """Feynman re-explanation, generated once per (topic, attempt)."""
+    return store.get(("feynman", RETEACH.version, canonical_topic(topic), attempt), feynman_explanation, topic)
+
+
+def _prefetch_retry_quiz(topic, attempt):
+    # Fail path: Feynman text for this attempt, then the "easy" quiz built from it.
+    simple_explanation = cached_feynman(topic, attempt)
+    mcqs = cached_mcqs(topic, simple_explanation, "easy", attempt + 1)
+    store.get(_relevance_key(simple_explanation, mcqs), compute_relevance_score, simple_explanation, mcqs)
+
 
 # =============================
-# UPDATED: quiz attempts (max 3 tries with re-explain + re-quiz)
+# Curriculum graph (prerequisites, mastery thresholds, next-topic table)
 # =============================
-MAX_ATTEMPTS = 3
-if "attempt" not in st.session_state:
-    st.session_state.attempt = 1
+@st.cache_resource
+def _curriculum() -> CurriculumGraph:
+    return CurriculumGraph.from_dicts(CURRICULUM)
+
+
+curriculum = _curriculum()
+
+
+def _warm_topic(topic):
+    store.prefetch(_context_key(topic), get_context, topic)
+
+
+@st.cache_resource
+def _prefetch_planner() -> PrefetchPlanner:
+    # one planner per process: demand is counted across all active sessions
+    return PrefetchPlanner(curriculum, _warm_topic)
+
+
+planner = _prefetch_planner()
 
 
 # Helper: move to next checkpoint topic (UI only)
 def _get_next_checkpoint_topic(current_topic: str):
-    if current_topic in CHECKPOINT_TOPICS:
-        idx = CHECKPOINT_TOPICS.index(current_topic)
-        if idx + 1 < len(CHECKPOINT_TOPICS):
-            return CHECKPOINT_TOPICS[idx + 1]
-    return None
-
-
-def _reset_for_new_topic(topic_value: str):
-    """UI-only reset for starting or switching topics."""
-    st.session_state.topic = topic_value
-    st.session_state.stage = "teaching"
-    st.session_state.relevance_score = None
-    st.session_state.score = None
-    st.session_state.explanation = ""
-    st.session_state.simple_explanation = ""
-    st.session_state.mcqs = []
-    st.session_state.mcq_answers = {}
-    st.session_state.attempt = 1
+    return curriculum.next_topic(current_topic)
+
+
+def _render_relevance():
+    if poll_relevance() is not None:
+        st.info(f"Question relevance: {st.session_state.learning.relevance_score}%")
+        return True
+    st.caption("Scoring question relevance…")
+    return False
+
+
+def _await_relevance():
+    if _render_relevance():
+        # one full rerun renders the score without this timer, so polling stops
+        st.rerun()
+
+
+# Re-check every second while the score is pending (st.fragment needs Streamlit >= 1.37;
+# older versions fill it in on the next interaction).
+if hasattr(st, "fragment"):
+    _await_relevance = st.fragment(run_every=1.0)(_await_relevance)
+
+
+def _show_relevance():
+    if poll_relevance() is None:
+        _await_relevance()
+    else:
+        _render_relevance()
+
+
+def _prefetch_next_steps(sess):
+    """While the learner takes the quiz, warm the content for both possible outcomes."""
+    planner.update(sess.session_id, sess.topic, sess.mastered)
+    if sess.attempt < MAX_ATTEMPTS:
+        key = ("retry-prefetch", canonical_topic(sess.topic), sess.attempt)
+        store.prefetch(key, _prefetch_retry_quiz, sess.topic, sess.attempt)
+
+
+# =============================
+# Learning session (teach -> quiz -> score -> feynman), checkpointed per step
+# =============================
+@st.cache_resource
+def _learning_graph() -> LearningGraph:
+    return LearningGraph(
+        SQLiteCheckpointer(),
+        explain=cached_context,
+        quiz=cached_mcqs,
+        reteach=cached_feynman,
+        passed=curriculum.has_mastered,
+        max_attempts=MAX_ATTEMPTS,
+    )
+
+
+learning = _learning_graph()
+
+if "learning" not in st.session_state:
+    # ?session=<id> survives refreshes and reconnects: resume from the last checkpoint
+    # (st.query_params needs Streamlit >= 1.30; older versions start a new session).
+    params = getattr(st, "query_params", None)
+    st.session_state.learning = learning.resume(params.get("session") if params is not None else None)
+    if params is not None:
+        params["session"] = st.session_state.learning.session_id
+
+sess = st.session_state.learning
 
 # =============================
 # UPDATED UI: Start Learning always visible; guard with topic validation
@@ -218,7 +333,7 @@ def _reset_for_new_topic(topic_value: str):
 start_clicked = st.button("🚀 Start Learning", use_container_width=True)
 if start_clicked:
     if final_topic:
-        _reset_for_new_topic(final_topic)
+        learning.start_topic(sess, final_topic)
         st.rerun()
     else:
         st.warning("Please select or search a topic first.")
@@ -226,152 +341,117 @@ if start_clicked:
 # -----------------------------
 # Teaching Stage
 # -----------------------------
-if st.session_state.stage == "teaching":
+if sess.stage == "teaching":
     st.divider()
     # =============================
     # UPDATED UI: Explanation in its own box
     # =============================
     with st.container(border=True):
         st.subheader("📘 Explanation")
-        st.session_state.explanation = get_context(st.session_state.topic)
-        st.write(st.session_state.explanation)
+        st.write(sess.explanation)
         st.caption("Step flow: topic → explain → quiz → score → Feynman.")
+    planner.update(sess.session_id, sess.topic, sess.mastered)
 
     # =============================
     # UPDATED: show "Start Quiz" button after explanation
     # =============================
     if st.button("📝 Start Quiz", use_container_width=True):
-        st.session_state.attempt = 1
-        st.session_state.score = None
         # =============================
         # UPDATED: MCQs derived ONLY from what was explained
         # =============================
-        # Backward-compatible call (in case Streamlit server has an older function loaded)
-        try:
-            st.session_state.mcqs = generate_mcqs(
-                st.session_state.topic,
-                context_text=st.session_state.explanation,
-                difficulty="normal",
-            )
-        except TypeError:
-            # Fallback: generate without context constraint (requires server restart to pick up new signature)
-            st.session_state.mcqs = generate_mcqs(st.session_state.topic)
-
-        st.session_state.relevance_score = compute_relevance_score(
-            st.session_state.explanation,
-            st.session_state.mcqs,
-        )
-        st.session_state.mcq_answers = {i: None for i in range(len(st.session_state.mcqs))}
-        st.session_state.stage = "quiz"
+        learning.start_quiz(sess)
+        start_relevance(sess)
         st.rerun()
 
 # -----------------------------
 # Answer & Evaluation
 # -----------------------------
-if st.session_state.stage == "quiz":
+if sess.stage == "quiz":
     st.divider()
     # =============================
     # UPDATED UI: Explanation box (separate)
     # =============================
     with st.container(border=True):
         st.subheader("📘 Explanation")
-        st.write(st.session_state.explanation or "Explanation not available.")
+        st.write(sess.explanation or "Explanation not available.")
 
-    mcqs = st.session_state.mcqs or []
-    answers = st.session_state.mcq_answers or {}
+    # Pass path needs the next checkpoint's explanation, fail path the Feynman text + easy quiz.
+    _prefetch_next_steps(sess)
 
     # =============================
     # UPDATED UI: Quiz box (separate)
     # =============================
     with st.container(border=True):
-        st.subheader(f"❓ Quiz (10 MCQs) — Attempt {st.session_state.attempt}/{MAX_ATTEMPTS}")
-        if st.session_state.relevance_score is not None:
-            st.info(f"Question relevance: {st.session_state.relevance_score}%")
+        st.subheader(f"❓ Quiz (10 MCQs) — Attempt {sess.attempt}/{MAX_ATTEMPTS}")
+        _show_relevance()
 
         # If quiz didn't load, regenerate and rerun (keeps UI consistent)
-        if len(mcqs) != 10:
+        if len(sess.mcqs) != 10:
             st.warning("Quiz questions were not loaded. Regenerating quiz now...")
-            try:
-                st.session_state.mcqs = generate_mcqs(
-                    st.session_state.topic,
-                    context_text=st.session_state.explanation,
-                    difficulty="normal" if st.session_state.attempt == 1 else "easy",
-                )
-            except TypeError:
-                st.session_state.mcqs = generate_mcqs(st.session_state.topic)
-            st.session_state.relevance_score = compute_relevance_score(
-                st.session_state.explanation,
-                st.session_state.mcqs,
-            )
-            st.session_state.mcq_answers = {i: None for i in range(len(st.session_state.mcqs))}
+            learning.regenerate_quiz(sess)
+            start_relevance(sess)
             st.rerun()
 
-        for idx, q in enumerate(st.session_state.mcqs, start=1):
+        for idx, q in enumerate(sess.mcqs, start=1):
             st.markdown(f"**Q{idx}. {q['question']}**")
             choice = st.radio(
                 label=f"Select an option for Q{idx}",
                 options=list(range(4)),
                 format_func=lambda i, opts=q["options"]: opts[i],
-                index=answers.get(idx - 1, None),
-                key=f"mcq_{idx}",
+                index=sess.answers[idx - 1],
+                key=f"mcq_{sess.attempt}_{idx}",
             )
-            st.session_state.mcq_answers[idx - 1] = choice
+            # checkpointed on change, so a refresh keeps the answers given so far
+            learning.answer(sess, idx - 1, choice)
             st.divider()
 
-    answered_all = (len(st.session_state.mcqs) == 10) and all(
-        st.session_state.mcq_answers.get(i) is not None for i in range(len(st.session_state.mcqs))
-    )
-
     # =============================
     # UPDATED UI: Submit box (separate)
     # =============================
     with st.container(border=True):
         st.subheader("✅ Submit Answers")
         if st.button("✅ Submit MCQs", use_container_width=True):
-            if not answered_all:
+            if not (len(sess.mcqs) == 10 and sess.answered_all):
                 st.warning("Please answer all 10 MCQs to get an accurate score.")
                 st.stop()
 
-            correct = 0
-            for i, q in enumerate(st.session_state.mcqs):
-                if st.session_state.mcq_answers.get(i) == q.get("answer_index"):
-                    correct += 1
-            st.session_state.score = int((correct / 10) * 100)
-            st.session_state.stage = "result"
+            with st.spinner("Scoring..."):
+                learning.submit(sess)
             st.rerun()
 
 # -----------------------------
 # Result + 70% rule + retry up to 3 times
 # -----------------------------
-if st.session_state.stage == "result":
+if sess.stage == "result":
     st.divider()
-    score = st.session_state.score if st.session_state.score is not None else 0
+    score = sess.score if sess.score is not None else 0
+    passed = curriculum.has_mastered(sess.topic, score)
 
     # =============================
     # UPDATED UI: Score & feedback box
     # =============================
     with st.container(border=True):
         st.subheader("📊 Score & Feedback")
-        st.write(f"**Topic:** {st.session_state.topic}")
+        st.write(f"**Topic:** {sess.topic}")
         st.write(f"**Score:** {score}%")
 
-        if score >= 70:
+        if passed:
             st.success("Congratulations! You understood the topic.")
         else:
-            st.error("Below 70% mastery. Feynman re-teaching is triggered.")
+            st.error(f"Below {curriculum.threshold(sess.topic)}% mastery. Feynman re-teaching is triggered.")
 
     # Success path: Learn Next Topic button (auto-advance through checkpoints)
-    if score >= 70:
+    if passed:
         with st.container(border=True):
             st.subheader("➡️ Next Step")
-            next_topic = _get_next_checkpoint_topic(st.session_state.topic)
+            next_topic = _get_next_checkpoint_topic(sess.topic)
             if next_topic:
                 if st.button("Learn Next Topic", use_container_width=True):
                     # UI-only: set checkpoint selection to next and start teaching immediately
                     st.session_state.active_source = "checkpoint"
                     st.session_state.checkpoint_topic = next_topic
                     st.session_state.topic_input = ""
-                    _reset_for_new_topic(next_topic)
+                    learning.start_topic(sess, next_topic)
                     st.rerun()
             else:
                 st.info("You have completed all topics.")
@@ -380,39 +460,25 @@ if st.session_state.stage == "result":
         # Failure path: Feynman box + retry
         with st.container(border=True):
             st.subheader("🔁 Feynman Re-Explanation")
-            st.session_state.simple_explanation = feynman_explanation(st.session_state.topic)
-            st.write(st.session_state.simple_explanation)
+            # Generated once on submit and checkpointed with the session
+            st.write(sess.simple_explanation)
 
-        if st.session_state.attempt < MAX_ATTEMPTS:
+        if learning.can_retry(sess):
             if st.button("📝 Start Quiz Again", use_container_width=True):
-                st.session_state.attempt += 1
-                st.session_state.score = None
-                try:
-                    st.session_state.mcqs = generate_mcqs(
-                        st.session_state.topic,
-                        context_text=st.session_state.simple_explanation,
-                        difficulty="easy",
-                    )
-                except TypeError:
-                    st.session_state.mcqs = generate_mcqs(st.session_state.topic)
-                st.session_state.relevance_score = compute_relevance_score(
-                    st.session_state.simple_explanation,
-                    st.session_state.mcqs,
-                )
-                st.session_state.mcq_answers = {i: None for i in range(len(st.session_state.mcqs))}
-                st.session_state.stage = "quiz"
+                learning.retry(sess)
+                start_relevance(sess)
                 st.rerun()
         else:
             with st.container(border=True):
                 st.warning("Maximum attempts reached (3). Please review and try again.")
                 if st.button("↩️ Back to Topic Selection", use_container_width=True):
-                    st.session_state.stage = "start"
+                    learning.reset(sess)
                     st.rerun()
 
 # -----------------------------
 # End Message
 # -----------------------------
-if st.session_state.stage == "done":
+if sess.stage == "done":
     st.divider()
     # =============================
     # UPDATED UI: reset box (re-learning without restarting app)
@@ -421,13 +487,5 @@ if st.session_state.stage == "done":
         st.subheader("🔄 Reset / Re-learn")
         st.caption("You can select any topic above and click Start Learning again.")
         if st.button("Reset Current Session", use_container_width=True):
-            st.session_state.stage = "start"
-            st.session_state.score = None
-            st.session_state.explanation = ""
-            st.session_state.simple_explanation = ""
-            st.session_state.relevance_score = None
-            st.session_state.mcqs = []
-            st.session_state.mcq_answers = {}
-            st.session_state.attempt = 1
-            st.session_state.topic = ""
+            learning.reset(sess)
             st.rerun()
@@ -9,6 +9,7 @@ from passlib.context import CryptContext
 
 from database import get_database
 from models import TokenData
+from tracing import span
 
 # Security configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
@@ -45,7 +46,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with span("auth.jwt"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
@@ -54,7 +56,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         raise credentials_exception
 
     db = get_database()
-    user = await db.users.find_one({"email": token_data.email})
+    with span("auth.db"):
+        user = await db.users.find_one({"email": token_data.email})
     if user is None:
         raise credentials_exception
     return user
@@ -1,7 +1,7 @@
 import asyncio
 import os
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
+from database import DATABASE_NAME, create_client
 
 load_dotenv()
 
@@ -10,7 +10,7 @@ async def check_all_databases():
     print(f"🔗 Connecting to: {mongodb_url[:50]}...")
     print()
     
-    client = AsyncIOMotorClient(mongodb_url)
+    client = create_client(mongodb_url, minPoolSize=0)
     
     # List all databases
     db_names = await client.list_database_names()
@@ -41,7 +41,7 @@ async def check_all_databases():
             print()
     
     # Check our specific database
-    db = client["autonomous_learning_agent"]
+    db = client[DATABASE_NAME]
     collections = await db.list_collection_names()
     progress_count = await db.progress.count_documents({})
     users_count = await db.users.count_documents({})
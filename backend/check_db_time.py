@@ -1,7 +1,7 @@
 import asyncio
 import os
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
+from database import DATABASE_NAME, create_client
 from datetime import datetime
 import pytz
 
@@ -9,8 +9,8 @@ load_dotenv()
 
 async def check_latest_progress():
     mongodb_url = os.getenv("MONGODB_URL")
-    client = AsyncIOMotorClient(mongodb_url)
-    db = client["autonomous_learning_agent"]
+    client = create_client(mongodb_url, minPoolSize=0)
+    db = client[DATABASE_NAME]
     
     # Get the latest progress record
     latest = await db.progress.find_one(sort=[("date", -1)])
@@ -0,0 +1,205 @@
+"""
+Circuit breaker for calls to the LLM provider.
+
+States:
+
+    closed     calls go through; outcomes are kept for the last `window_seconds`.
+               Once at least `min_calls` have completed, the circuit opens when
+               the failure rate reaches `failure_rate` or the share of calls slower
+               than `slow_call_seconds` reaches `slow_call_rate`.
+    open       calls fail immediately with CircuitOpenError (callers serve cached
+               or fallback content) until `open_seconds` have passed.
+    half_open  up to `half_open_probes` calls are let through as probes, the rest
+               are rejected. The circuit closes once that many probes succeed in a
+               row and re-opens on the first failed or slow probe.
+
+One breaker (llm_circuit()) is shared by every client in the process, so both
+context managers see the same provider state. Standard library only, so the
+Streamlit app can import it as `backend.circuit_breaker`.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+try:
+    from metrics import LLM_CIRCUIT_REJECTED, LLM_CIRCUIT_STATE, LLM_CIRCUIT_TRANSITIONS
+except ImportError:  # imported as backend.circuit_breaker from the project root
+    from backend.metrics import LLM_CIRCUIT_REJECTED, LLM_CIRCUIT_STATE, LLM_CIRCUIT_TRANSITIONS
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+# exported as the llm_circuit_state gauge
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the provider while the circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit is open; retrying the provider in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 30.0,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        # (finished at, failed, slow) per call completed while closed
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        # bumped on every transition, so probes admitted in an earlier half-open period are ignored
+        self._generation = 0
+        LLM_CIRCUIT_STATE.set(STATE_VALUES[CLOSED], circuit=name)
+
+    @classmethod
+    def from_env(cls, name: str) -> "CircuitBreaker":
+        return cls(
+            name,
+            window_seconds=float(os.getenv("LLM_CIRCUIT_WINDOW_SECONDS", "30")),
+            min_calls=int(os.getenv("LLM_CIRCUIT_MIN_CALLS", "5")),
+            failure_rate=float(os.getenv("LLM_CIRCUIT_FAILURE_RATE", "0.5")),
+            slow_call_seconds=float(os.getenv("LLM_CIRCUIT_SLOW_CALL_SECONDS", "10")),
+            slow_call_rate=float(os.getenv("LLM_CIRCUIT_SLOW_CALL_RATE", "0.8")),
+            open_seconds=float(os.getenv("LLM_CIRCUIT_OPEN_SECONDS", "30")),
+            half_open_probes=int(os.getenv("LLM_CIRCUIT_HALF_OPEN_PROBES", "2")),
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run `fn` through the breaker; raises CircuitOpenError without calling it while open."""
+        probe = self._acquire()
+        start = self._clock()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._record(probe, failed=True, duration=self._clock() - start)
+            raise
+        self._record(probe, failed=False, duration=self._clock() - start)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State and window statistics, as shown by GET /."""
+        with self._lock:
+            self._maybe_half_open()
+            self._trim(self._clock())
+            calls = len(self._outcomes)
+            info: Dict[str, Any] = {
+                "state": self._state,
+                "calls": calls,
+                "failure_rate": round(sum(o[1] for o in self._outcomes) / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(sum(o[2] for o in self._outcomes) / calls, 3) if calls else 0.0,
+            }
+            if self._state == OPEN:
+                info["retry_in_seconds"] = round(self._retry_in(), 1)
+            return info
+
+    # ----- internals (called with self._lock held unless noted) -----
+
+    def _acquire(self) -> Optional[int]:
+        """Admit a call; returns the generation for a half-open probe, None for a regular call."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return None
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_probes - self._probe_successes:
+                self._probes_in_flight += 1
+                return self._generation
+            retry_in = self._retry_in()
+        LLM_CIRCUIT_REJECTED.inc(circuit=self.name)
+        raise CircuitOpenError(self.name, retry_in)
+
+    def _record(self, probe: Optional[int], failed: bool, duration: float) -> None:
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if probe is not None:
+                if probe != self._generation:
+                    return
+                self._probes_in_flight -= 1
+                if failed or slow:
+                    self._transition(OPEN)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(CLOSED)
+                return
+            if self._state != CLOSED:
+                # a call admitted before the circuit opened; the probes decide from here
+                return
+            now = self._clock()
+            self._outcomes.append((now, failed, slow))
+            self._trim(now)
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(o[1] for o in self._outcomes)
+            slow_calls = sum(o[2] for o in self._outcomes)
+            if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+                self._transition(OPEN)
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and self._retry_in() <= 0:
+            self._transition(HALF_OPEN)
+
+    def _retry_in(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - self._clock())
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        if state == OPEN:
+            self._opened_at = self._clock()
+            self._outcomes.clear()
+            print(f"Warning: {self.name} circuit opened; serving cached/fallback content for {self.open_seconds:.0f}s")
+        self._generation += 1
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        LLM_CIRCUIT_STATE.set(STATE_VALUES[state], circuit=self.name)
+        LLM_CIRCUIT_TRANSITIONS.inc(circuit=self.name, state=state)
+
+
+_circuit: Optional[CircuitBreaker] = None
+_circuit_lock = threading.Lock()
+
+
+def llm_circuit() -> CircuitBreaker:
+    """The process-wide breaker for the LLM provider (settings from LLM_CIRCUIT_*, read on first use)."""
+    global _circuit
+    if _circuit is None:
+        with _circuit_lock:
+            if _circuit is None:
+                _circuit = CircuitBreaker.from_env("llm")
+    return _circuit
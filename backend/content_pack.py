@@ -0,0 +1,199 @@
+"""
+Read-only, memory-mapped content packs of precomputed learning content.
+
+File layout (little-endian):
+
+    header  | magic "ALCPACK1", format version, entry count, index offset, meta offset, meta length
+    data    | UTF-8 blobs: key, explanation, reteach text, quizzes (JSON array) per entry
+    index   | fixed-size records sorted by key hash:
+            |   hash u64, then (offset u64, length u32) for key, explanation, reteach, quizzes
+    meta    | JSON: pack version, prompt version, per-template prompt versions, model, created_at, ...
+
+Keys are "<prompt version>\\x1f<canonical topic>" (see topics.canonical_topic), and
+meta["prompt_versions"] records the version of each template (prompts.py) the
+entries were generated with, so callers can tell outdated content apart. Opening a pack only maps
+the file and reads the header, so startup cost does not grow with the number
+of topics; a lookup is a binary search over the index in the mapping and
+returns a memoryview into it (decoded to str only when asked). The pages are
+shared by every worker process that maps the same file.
+
+This module only uses the standard library so the Streamlit app can import
+it as `backend.content_pack`.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import random
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from topics import canonical_topic
+except ImportError:  # imported as backend.content_pack from the project root
+    from backend.topics import canonical_topic
+
+MAGIC = b"ALCPACK1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")
+# hash, then (offset, length) for key, explanation, reteach, quizzes
+INDEX_RECORD = struct.Struct("<Q" + "QI" * 4)
+FIELDS = ("key", "explanation", "reteach", "quizzes")
+KEY_SEPARATOR = "\x1f"
+DEFAULT_PROMPT_VERSION = "1"
+
+
+def entry_key(topic: str, prompt_version: str) -> str:
+    return f"{prompt_version}{KEY_SEPARATOR}{canonical_topic(topic)}"
+
+
+def _key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def write_pack(path: str, entries: Dict[str, Dict[str, Any]], meta: Dict[str, Any]) -> str:
+    """Write `entries` ({topic: {"explanation", "reteach", "quizzes"}}) as a pack at `path`.
+
+    meta["prompt_version"] is the version every entry is keyed under.
+    """
+    prompt_version = str(meta.get("prompt_version", DEFAULT_PROMPT_VERSION))
+    blobs: List[Tuple[int, List[bytes]]] = []
+    seen = set()
+    for topic, entry in entries.items():
+        key = entry_key(topic, prompt_version).encode("utf-8")
+        if key in seen:
+            # e.g. "What is Machine Learning?" after "Machine Learning": first one wins
+            continue
+        seen.add(key)
+        fields = [
+            key,
+            (entry.get("explanation") or "").encode("utf-8"),
+            (entry.get("reteach") or "").encode("utf-8"),
+            json.dumps(entry.get("quizzes") or [], ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+        ]
+        blobs.append((_key_hash(key), fields))
+    blobs.sort(key=lambda item: item[0])
+
+    meta_bytes = json.dumps({**meta, "entries": len(blobs)}, ensure_ascii=False).encode("utf-8")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(b"\0" * HEADER.size)
+        records = []
+        for key_hash, fields in blobs:
+            spans = []
+            for blob in fields:
+                spans.extend((fh.tell(), len(blob)))
+                fh.write(blob)
+            records.append(INDEX_RECORD.pack(key_hash, *spans))
+        index_offset = fh.tell()
+        for record in records:
+            fh.write(record)
+        meta_offset = fh.tell()
+        fh.write(meta_bytes)
+        fh.seek(0)
+        fh.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(records), index_offset, meta_offset, len(meta_bytes)))
+    os.replace(tmp_path, path)
+    return path
+
+
+class ContentPack:
+    """Zero-copy lookups into a memory-mapped pack file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+        magic, fmt, count, index_offset, meta_offset, meta_length = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} content pack")
+        self._count = count
+        self._index_offset = index_offset
+        self.meta: Dict[str, Any] = json.loads(str(self._view[meta_offset : meta_offset + meta_length], "utf-8"))
+        self.prompt_version = str(self.meta.get("prompt_version", DEFAULT_PROMPT_VERSION))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, topic: object) -> bool:
+        """Whether the pack has an entry for `topic` under its prompt version."""
+        return isinstance(topic, str) and self._find(entry_key(topic, self.prompt_version).encode("utf-8")) is not None
+
+    def is_current(self, template: Any) -> bool:
+        """Whether this pack's content for `template` (a prompts.PromptTemplate) was made with its current version."""
+        return (self.meta.get("prompt_versions") or {}).get(template.name) == template.version
+
+    def _record(self, i: int) -> Tuple[int, ...]:
+        return INDEX_RECORD.unpack_from(self._mm, self._index_offset + i * INDEX_RECORD.size)
+
+    def _find(self, key: bytes) -> Optional[Tuple[int, ...]]:
+        target = _key_hash(key)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[0] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        # walk the (rare) run of equal hashes and confirm the full key
+        while lo < self._count:
+            record = self._record(lo)
+            if record[0] != target:
+                return None
+            key_off, key_len = record[1], record[2]
+            if self._view[key_off : key_off + key_len] == key:
+                return record
+            lo += 1
+        return None
+
+    def raw(self, topic: str, field: str, prompt_version: Optional[str] = None) -> Optional[memoryview]:
+        """Memoryview of one field of the entry for `topic`, or None when absent/empty."""
+        version = self.prompt_version if prompt_version is None else prompt_version
+        record = self._find(entry_key(topic, version).encode("utf-8"))
+        if record is None:
+            return None
+        i = FIELDS.index(field)
+        offset, length = record[1 + 2 * i], record[2 + 2 * i]
+        return self._view[offset : offset + length] if length else None
+
+    def text(self, topic: str, field: str, prompt_version: Optional[str] = None) -> Optional[str]:
+        blob = self.raw(topic, field, prompt_version)
+        return str(blob, "utf-8") if blob is not None else None
+
+    def explanation(self, topic: str, prompt_version: Optional[str] = None) -> Optional[str]:
+        return self.text(topic, "explanation", prompt_version)
+
+    def reteach(self, topic: str, prompt_version: Optional[str] = None) -> Optional[str]:
+        return self.text(topic, "reteach", prompt_version)
+
+    def quizzes(self, topic: str, prompt_version: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        blob = self.raw(topic, "quizzes", prompt_version)
+        return json.loads(str(blob, "utf-8")) if blob is not None else []
+
+    def quiz(self, topic: str, prompt_version: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """One of the stored quiz variants for `topic`, picked at random."""
+        variants = self.quizzes(topic, prompt_version)
+        return random.choice(variants) if variants else None
+
+    def topics(self) -> Iterable[str]:
+        for i in range(self._count):
+            record = self._record(i)
+            key = str(self._view[record[1] : record[1] + record[2]], "utf-8")
+            yield key.split(KEY_SEPARATOR, 1)[1]
+
+    def close(self) -> None:
+        self._view.release()
+        self._mm.close()
+
+
+def load_content_pack(path: Optional[str] = None) -> Optional[ContentPack]:
+    """Open the pack at `path` (default: $CONTENT_PACK_PATH); None when unset or unreadable."""
+    path = path or os.getenv("CONTENT_PACK_PATH")
+    if not path:
+        return None
+    try:
+        return ContentPack(path)
+    except (OSError, ValueError) as exc:
+        print(f"Warning: content pack {path!r} not loaded: {exc}")
+        return None
@@ -1,21 +1,43 @@
-
+import contextvars
+import hashlib
 import json
 import os
+import random
 import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
-try:
-    from langchain_groq import ChatGroq
-except ModuleNotFoundError:
-    ChatGroq = None
-
-
-env_loaded = load_dotenv()
-if not env_loaded:
-    load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
+from circuit_breaker import CLOSED, CircuitBreaker, CircuitOpenError, llm_circuit
+from content_pack import load_content_pack
+from deadline import DeadlineExceeded, fits, remaining
+from hedging import HedgePolicy, llm_hedger
+from llm import build_llm_client
+from metrics import (
+    CACHE_ENTRIES,
+    CACHE_REQUESTS,
+    DEADLINE_SKIPPED_STEPS,
+    DEADLINES_EXCEEDED,
+    GENERATED_CONTENT,
+    LLM_ERRORS,
+    LLM_REQUEST_DURATION,
+    LLM_TOKENS,
+    PROMPT_MIGRATION_BACKLOG,
+    PROMPT_MIGRATIONS,
+    SPECULATIVE_GENERATIONS,
+)
+from profiling import profile_thread
+from prompts import API_EXPLAIN, API_QUIZ, API_RELEVANCE, API_RETEACH, EXPLAIN, QUIZ, RETEACH
+from topics import TopicIndex, canonical_topic
+from tracing import span
+
+# find_dotenv() walks up from this file, so a project-root .env is found too.
+load_dotenv()
 
 
 def _extract_json_object(text: str) -> Optional[str]:
@@ -67,6 +89,108 @@ def _tokenize(text: str) -> set:
     return {w for w in re.findall(r"[A-Za-z0-9]+", (text or "").lower()) if len(w) > 3}
 
 
+def _clean_mcqs(questions: List[Any]) -> List[Dict[str, Any]]:
+    """Keep only well-formed MCQs (non-empty question, 4 options, answer index 0-3)."""
+    cleaned: List[Dict[str, Any]] = []
+    for item in questions:
+        if not isinstance(item, dict):
+            continue
+        q = str(item.get("question", "")).strip()
+        opts = item.get("options", [])
+        ans = item.get("answer_index", None)
+        if not q or not isinstance(opts, list) or len(opts) != 4:
+            continue
+        try:
+            ans_i = int(ans)
+        except Exception:
+            continue
+        if ans_i < 0 or ans_i > 3:
+            continue
+        cleaned.append({"question": q, "options": [str(o).strip() for o in opts], "answer_index": ans_i})
+    return cleaned
+
+
+def _lexical_relevance_score(explanation: str, questions: List[Dict[str, Any]]) -> int:
+    """Token-overlap estimate of how grounded the MCQs are in the explanation."""
+    exp_tokens = _tokenize(explanation)
+    if not exp_tokens:
+        return 50
+
+    overlaps: List[float] = []
+    for q in questions:
+        mcq_text = (q.get("question", "") or "") + " " + " ".join(q.get("options", []) or [])
+        mcq_tokens = _tokenize(mcq_text)
+        if not mcq_tokens:
+            continue
+        overlaps.append(len(mcq_tokens & exp_tokens) / max(1, len(mcq_tokens)))
+
+    if not overlaps:
+        return 50
+
+    avg = sum(overlaps) / len(overlaps)
+    return max(0, min(100, int((0.35 + avg) * 100)))
+
+
+def _log_llm_failure(operation: str, topic: str, exc: Exception) -> None:
+    # short-circuited calls are counted by the breaker; logging each would flood the output while it is open
+    if not isinstance(exc, CircuitOpenError):
+        print(f"Warning: {operation} for {topic!r} failed, serving fallback content: {exc}")
+
+
+# Seconds an entry is served as-is before a background refresh, by quality:
+# llm = clean model output, repaired = usable output that needed fixing (fences, truncation),
+# fallback = template text. Stale entries are still served while the refresh runs.
+FRESH_SECONDS = {
+    "llm": float(os.getenv("CACHE_FRESH_SECONDS", str(6 * 3600))),
+    "repaired": float(os.getenv("CACHE_REPAIRED_FRESH_SECONDS", "1800")),
+    "fallback": float(os.getenv("CACHE_FALLBACK_FRESH_SECONDS", "60")),
+    # copied from the content pack, which does not change while the process runs
+    "pack": float("inf"),
+}
+QUALITY_RANK = {"fallback": 0, "repaired": 1, "llm": 2, "pack": 2}
+
+# Assumed latency (s) of an optional LLM step until enough calls were seen to use their p90.
+DEFAULT_STEP_SECONDS = 2.0
+
+# Template each cached operation is generated with, the (Streamlit/CLI) template its
+# content-pack entries were built with, and their field in content packs.
+TEMPLATES = {"explain": API_EXPLAIN, "reteach": API_RETEACH}
+PACK_TEMPLATES = {"explain": EXPLAIN, "reteach": RETEACH}
+PACK_FIELDS = {"explain": "explanation", "reteach": "reteach"}
+
+
+def _repair_text(response: Any) -> Tuple[str, str]:
+    """Return (text, quality) for an LLM text response."""
+    text = (getattr(response, "content", "") or "").strip()
+    quality = "llm"
+    fenced = re.fullmatch(r"```[\w-]*\n([\s\S]*?)\n?```", text)
+    if fenced:
+        text, quality = fenced.group(1).strip(), "repaired"
+    metadata = getattr(response, "response_metadata", None) or {}
+    if metadata.get("finish_reason") == "length":
+        quality = "repaired"
+    return text, quality
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    quality: str
+    # version of the prompt template the value was generated with (see prompts.py)
+    version: str = ""
+    created: float = field(default_factory=time.monotonic)
+    # last time the entry was (re)validated; a failed upgrade keeps the value but resets this
+    checked: float = field(default_factory=time.monotonic)
+    # validated, pre-encoded response body; filled in by main.py on the first request that serves the entry
+    encoded: Any = field(default=None, repr=False, compare=False)
+
+    def age(self) -> float:
+        return time.monotonic() - self.created
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.checked < FRESH_SECONDS[self.quality]
+
+
 @dataclass
 class ContextManager:
     """Stores per-topic generated content so downstream steps are grounded."""
@@ -74,71 +198,413 @@ class ContextManager:
     model: str = field(default_factory=lambda: os.getenv("GROQ_MODEL") or "llama-3.1-8b-instant")
     temperature: float = 0.3
     _llm: Any = field(init=False, default=None)
-    _explanations: Dict[str, str] = field(init=False, default_factory=dict)
-    _simplified: Dict[str, str] = field(init=False, default_factory=dict)
+    # Shared with every LLM client in the process; while open, calls fail fast and fallbacks are served.
+    _circuit: CircuitBreaker = field(init=False, default_factory=llm_circuit)
+    # Optional (LLM_HEDGE_ENABLED): a call still running after the operation's p90 gets a duplicate request.
+    _hedger: HedgePolicy = field(init=False, default_factory=llm_hedger)
+    _pack: Any = field(init=False, default=None)
+    _explanations: Dict[str, CacheEntry] = field(init=False, default_factory=dict)
+    _simplified: Dict[str, CacheEntry] = field(init=False, default_factory=dict)
+    # Caches are keyed by canonical topic; near-duplicates of known keys reuse their entries.
+    _topic_index: TopicIndex = field(init=False, default_factory=TopicIndex)
+    # Quizzes by explanation key: (digest of the explanation they were made from, variants).
+    # Up to `quiz_variants` are generated per explanation, then served at random.
+    _quizzes: Dict[str, Tuple[str, List[CacheEntry]]] = field(init=False, default_factory=dict)
+    quiz_variants: int = field(default_factory=lambda: int(os.getenv("QUIZ_CACHE_VARIANTS", "3")))
+    # Single-flight: concurrent misses for the same (operation, template version, topic) share one generation.
+    _inflight: Dict[Tuple[str, str, str], Future] = field(init=False, default_factory=dict)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    # Speculation and stale-entry refreshes run on one background thread and are dropped
+    # when it backs up, so they never compete with more than one request's worth of LLM calls.
+    _background: Optional[ThreadPoolExecutor] = field(init=False, default=None)
+    _background_backlog: int = field(init=False, default=0)
+    max_background_backlog: int = 16
+    # Generations started by a request with a deadline run here, so the request can stop waiting
+    # at the deadline while the generation finishes and fills the cache.
+    _generation_pool: Optional[ThreadPoolExecutor] = field(init=False, default=None)
+    generation_workers: int = field(default_factory=lambda: int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "32")))
+    # Prompt migration: entries made with an outdated template version (cached or packed) keep
+    # being served while one thread regenerates them, most requested first, at a fixed rate.
+    migration_per_minute: float = field(default_factory=lambda: float(os.getenv("PROMPT_MIGRATION_PER_MINUTE", "20")))
+    # requests per queued (operation, key) while it is outdated; entries leave with their _outdated key
+    _popularity: Counter = field(init=False, default_factory=Counter)
+    _outdated: Dict[Tuple[str, str], str] = field(init=False, default_factory=dict)
+    _migrator: Optional[threading.Thread] = field(init=False, default=None)
 
     def __post_init__(self) -> None:
-        api_key = os.getenv("GROQ_API_KEY")
-        if api_key and ChatGroq is not None:
-            self._llm = ChatGroq(model=self.model, temperature=self.temperature, groq_api_key=api_key)
+        # Lazy: langchain_groq is imported and ChatGroq built on the first call or warm_up().
+        self._llm = build_llm_client(self.model, self.temperature)
+        # Precomputed content (CONTENT_PACK_PATH); mmap-backed, so opening it is cheap.
+        self._pack = load_content_pack()
 
     def has_llm(self) -> bool:
         return self._llm is not None
 
+    def pack_info(self) -> Optional[Dict[str, Any]]:
+        if self._pack is None:
+            return None
+        return {
+            "version": self._pack.meta.get("version"),
+            "topics": len(self._pack),
+            "outdated_prompts": [t.name for t in (EXPLAIN, RETEACH, QUIZ) if not self._pack.is_current(t)],
+        }
+
+    def circuit_info(self) -> Dict[str, Any]:
+        return self._circuit.snapshot()
+
+    def warm_up(self) -> None:
+        """Build the LLM client ahead of the first request (safe to call from a worker thread)."""
+        warm = getattr(self._llm, "warm_up", None)
+        if warm is not None:
+            warm()
+
+    def _invoke(self, operation: str, prompt: str) -> Any:
+        """Call the LLM (circuit breaker, then hedging), recording latency, token usage and errors for `operation`."""
+        start = time.perf_counter()
+        try:
+            with span(f"llm.{operation}"):
+                # the breaker sees one logical call: a hedge that wins counts as a fast success
+                response = self._circuit.call(self._hedger.call, operation, self._llm.invoke, prompt)
+        except CircuitOpenError:
+            # rejected without reaching the provider; counted by llm_circuit_rejected_total
+            raise
+        except Exception:
+            LLM_ERRORS.inc(operation=operation)
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - start, operation=operation)
+            raise
+        LLM_REQUEST_DURATION.observe(time.perf_counter() - start, operation=operation)
+
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage:
+            LLM_TOKENS.inc(usage.get("input_tokens", 0), operation=operation, direction="input")
+            LLM_TOKENS.inc(usage.get("output_tokens", 0), operation=operation, direction="output")
+        return response
+
+    def _flight(self, operation: str, key: str) -> Tuple[str, str, str]:
+        """Single-flight key of a cached explain/reteach generation."""
+        return operation, TEMPLATES[operation].version, key
+
+    def _single_flight(self, key: Tuple[str, str, str], generate: Callable[[], Any]) -> Any:
+        """Share one `generate()` between concurrent callers of `key`.
+
+        Without a deadline the first caller generates inline. Under one, generation runs on the
+        generation pool and every caller waits at most the remaining time (DeadlineExceeded).
+        """
+        left = remaining()
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                future.set_running_or_notify_cancel()
+                self._inflight[key] = future
+                if left is not None and self._generation_pool is None:
+                    self._generation_pool = ThreadPoolExecutor(
+                        max_workers=self.generation_workers, thread_name_prefix="context-generate"
+                    )
+
+        if owner:
+
+            def produce() -> None:
+                try:
+                    # a pool worker generating for a profiled request shows up in its profile
+                    with profile_thread():
+                        future.set_result(generate())
+                except BaseException as exc:
+                    future.set_exception(exc)
+                finally:
+                    with self._lock:
+                        self._inflight.pop(key, None)
+
+            if left is None:
+                produce()
+            else:
+                # in a copy of the request's context: trace spans, and the deadline for optional steps
+                self._generation_pool.submit(contextvars.copy_context().run, produce)
+        try:
+            return future.result(timeout=left)
+        except TimeoutError:
+            if future.done():
+                # generate() itself timed out
+                raise
+            raise DeadlineExceeded(f"{key[0]} generation still running at the deadline") from None
+
+    def _submit_background(self, fn: Callable[..., None], *args: Any) -> bool:
+        with self._lock:
+            if self._background_backlog >= self.max_background_backlog:
+                return False
+            self._background_backlog += 1
+            if self._background is None:
+                self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="context-background")
+        self._background.submit(self._run_background, fn, *args)
+        return True
+
+    def _run_background(self, fn: Callable[..., None], *args: Any) -> None:
+        try:
+            fn(*args)
+        finally:
+            with self._lock:
+                self._background_backlog -= 1
+
+    def _cache_key(self, store: Dict[str, CacheEntry], topic: str) -> Tuple[str, bool]:
+        """(key, is_near_duplicate) for `topic` in `store`."""
+        key = canonical_topic(topic)
+        # exact and pack hits skip the fuzzy match; the pack serves them under their own key
+        if key in store or (self._pack is not None and key in self._pack):
+            return key, False
+        near = self._topic_index.match(key)
+        if near is not None and near in store:
+            return near, True
+        return key, False
+
+    def _store(self, cache: str, store: Dict[str, CacheEntry], key: str, entry: CacheEntry) -> CacheEntry:
+        current = store.get(key)
+        if (
+            current is not None
+            and QUALITY_RANK[entry.quality] < QUALITY_RANK[current.quality]
+            and (current.version == entry.version or entry.quality == "fallback")
+        ):
+            # never downgrade: keep serving the better entry, check again after its TTL
+            current.checked = time.monotonic()
+            return current
+        store[key] = entry
+        self._topic_index.add(key)
+        CACHE_ENTRIES.set(len(store), cache=cache)
+        return entry
+
+    def _generate_and_store(
+        self,
+        cache: str,
+        store: Dict[str, CacheEntry],
+        key: str,
+        topic: str,
+        generate: Callable[[str], CacheEntry],
+    ) -> CacheEntry:
+        return self._store(cache, store, key, generate(topic))
+
+    def _refresh(
+        self,
+        operation: str,
+        cache: str,
+        store: Dict[str, CacheEntry],
+        key: str,
+        topic: str,
+        generate: Callable[[str], CacheEntry],
+    ) -> None:
+        entry = store[key]
+        if self._llm is None:
+            # nothing better to upgrade to until the process is configured
+            entry.checked = time.monotonic()
+            return
+        flight = self._flight(operation, key)
+
+        def refresh() -> None:
+            try:
+                self._single_flight(flight, lambda: self._generate_and_store(cache, store, key, topic, generate))
+            except Exception as exc:
+                entry.checked = time.monotonic()
+                print(f"Warning: background refresh of {operation} for {topic!r} failed: {exc}")
+
+        with self._lock:
+            if flight in self._inflight:
+                return
+        self._submit_background(refresh)
+
+    def _operation(self, operation: str) -> Tuple[str, Dict[str, CacheEntry], Callable[[str], CacheEntry]]:
+        """(cache name, store, generator) for "explain" or "reteach"."""
+        if operation == "explain":
+            return "explanations", self._explanations, self._generate_explanation
+        return "simplified", self._simplified, self._generate_reteach
+
+    def _lookup(self, operation: str, topic: str, force: bool) -> CacheEntry:
+        """Serve `topic` from the cache (refreshing stale/forced entries in the background), pack or LLM."""
+        cache, store, generate = self._operation(operation)
+        template = TEMPLATES[operation]
+        key, near = self._cache_key(store, topic)
+        entry = store.get(key)
+        if entry is not None:
+            if force or (not entry.is_fresh() and entry.version == template.version):
+                CACHE_REQUESTS.inc(cache=cache, result="stale")
+                self._refresh(operation, cache, store, key, topic, generate)
+            elif entry.version != template.version:
+                CACHE_REQUESTS.inc(cache=cache, result="outdated")
+                self._enqueue_migration(operation, key, topic)
+            else:
+                CACHE_REQUESTS.inc(cache=cache, result="near_hit" if near else "hit")
+            return entry
+        CACHE_REQUESTS.inc(cache=cache, result="miss")
+
+        packed = self._pack.text(topic, PACK_FIELDS[operation]) if self._pack is not None and not force else None
+        if packed:
+            # cached on first read, so later hits reuse the entry (and the body main.py encodes for it)
+            GENERATED_CONTENT.inc(operation=operation, source="pack")
+            current = self._pack.is_current(PACK_TEMPLATES[operation])
+            if not current:
+                self._enqueue_migration(operation, key, topic)
+            return self._store(cache, store, key, CacheEntry(packed, "pack", template.version if current else ""))
+
+        try:
+            return self._single_flight(
+                self._flight(operation, key), lambda: self._generate_and_store(cache, store, key, topic, generate)
+            )
+        except DeadlineExceeded:
+            return self._deadline_fallback(operation, topic)
+
+    def _deadline_fallback(self, operation: str, topic: str) -> CacheEntry:
+        """Fallback for a request whose budget ran out; not cached, the generation still fills the cache."""
+        DEADLINES_EXCEEDED.inc(operation=operation)
+        if operation == "explain":
+            label, fallback = "explanation", _medium_fallback_explanation(topic)
+        else:
+            label, fallback = "reteach", _very_simple_fallback_explanation(topic)
+        text = f"This is taking longer than usual. Showing fallback {label}:\n\n" + fallback
+        return CacheEntry(text, "fallback", TEMPLATES[operation].version)
+
+    def _enqueue_migration(self, operation: str, key: str, topic: str) -> None:
+        if self._llm is None:
+            # nothing to regenerate with; the outdated content is still better than a fallback
+            return
+        with self._lock:
+            self._popularity[(operation, key)] += 1
+            if (operation, key) in self._outdated:
+                return
+            self._outdated[(operation, key)] = topic
+            PROMPT_MIGRATION_BACKLOG.set(len(self._outdated))
+            if self._migrator is None:
+                self._migrator = threading.Thread(target=self._migrate, name="prompt-migrator", daemon=True)
+                self._migrator.start()
+
+    def _migrate(self) -> None:
+        """Drain the outdated set, most requested first, at `migration_per_minute`; exits when empty."""
+        interval = 60.0 / max(self.migration_per_minute, 1e-6)
+        next_at = time.monotonic()
+        while True:
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            with self._lock:
+                if not self._outdated:
+                    self._migrator = None
+                    return
+                item = max(self._outdated, key=self._popularity.__getitem__)
+                topic = self._outdated.pop(item)
+                del self._popularity[item]
+                PROMPT_MIGRATION_BACKLOG.set(len(self._outdated))
+            next_at = time.monotonic() + interval
+            self._migrate_one(item[0], item[1], topic)
+
+    def _migrate_one(self, operation: str, key: str, topic: str) -> None:
+        cache, store, generate = self._operation(operation)
+        current = store.get(key)
+        if current is not None and current.version == TEMPLATES[operation].version:
+            # already regenerated on another path (miss, forced refresh)
+            PROMPT_MIGRATIONS.inc(operation=operation, result="skipped")
+            return
+        try:
+            entry = self._single_flight(self._flight(operation, key), lambda: generate(topic))
+        except Exception as exc:
+            PROMPT_MIGRATIONS.inc(operation=operation, result="failed")
+            print(f"Warning: prompt migration of {operation} for {topic!r} failed: {exc}")
+            return
+        if entry.quality == "fallback":
+            # keep serving the outdated content; the next request for it queues it again
+            PROMPT_MIGRATIONS.inc(operation=operation, result="failed")
+            return
+        self._store(cache, store, key, entry)
+        PROMPT_MIGRATIONS.inc(operation=operation, result="migrated")
+
+    def cache_entry(self, operation: str, topic: str) -> Optional[CacheEntry]:
+        store = self._operation(operation)[1]
+        return store.get(self._cache_key(store, topic)[0])
+
     def explain(self, topic: str, *, force: bool = False) -> str:
-        if not force and topic in self._explanations:
-            return self._explanations[topic]
+        """Explanation for `topic`; `force` serves the current entry and regenerates it in the background."""
+        return self._lookup("explain", topic, force).value
 
+    def explain_entry(self, topic: str) -> CacheEntry:
+        """Like explain(), but the CacheEntry; pack hits are cached like any other entry."""
+        return self._lookup("explain", topic, False)
+
+    def _generate_explanation(self, topic: str) -> CacheEntry:
         if self._llm is None:
             explanation = (
                 "AI is not configured (missing GROQ_API_KEY or langchain-groq). Showing fallback explanation:\n\n"
                 + _medium_fallback_explanation(topic)
             )
-            self._explanations[topic] = explanation
-            return explanation
-
-        prompt = f"""
-You are a senior engineering instructor. Explain the topic: "{topic}".
-
-Requirements (B.Tech level, production-ready clarity):
-- Audience: engineering students.
-- Tone: professional, precise, and concise.
-- Structure with short sections: definition, core concepts, math/notation (if relevant),
-  typical workflow/architecture, constraints/performance trade-offs, common pitfalls,
-  and 2 practical engineering examples.
-- Add 3–5 key takeaways as bullet points.
-- Keep it focused (~200–350 words).
-"""
-        response = self._llm.invoke(prompt)
-        explanation = (response.content or "").strip() or _medium_fallback_explanation(topic)
-        self._explanations[topic] = explanation
-        return explanation
+            GENERATED_CONTENT.inc(operation="explain", source="fallback")
+            return CacheEntry(explanation, "fallback", API_EXPLAIN.version)
+
+        try:
+            response = self._invoke("explain", API_EXPLAIN.render(topic=topic))
+        except Exception as exc:
+            _log_llm_failure("explain", topic, exc)
+            explanation = (
+                "AI service is temporarily unavailable. Showing fallback explanation:\n\n"
+                + _medium_fallback_explanation(topic)
+            )
+            GENERATED_CONTENT.inc(operation="explain", source="fallback")
+            return CacheEntry(explanation, "fallback", API_EXPLAIN.version)
+        explanation, quality = _repair_text(response)
+        if not explanation:
+            explanation, quality = _medium_fallback_explanation(topic), "fallback"
+        GENERATED_CONTENT.inc(operation="explain", source=quality)
+        return CacheEntry(explanation, quality, API_EXPLAIN.version)
 
     def reteach(self, topic: str, *, force: bool = False) -> str:
-        if not force and topic in self._simplified:
-            return self._simplified[topic]
+        """Feynman-style text for `topic`; same caching rules as explain()."""
+        return self._lookup("reteach", topic, force).value
+
+    def reteach_entry(self, topic: str) -> CacheEntry:
+        return self._lookup("reteach", topic, False)
 
+    def _generate_reteach(self, topic: str) -> CacheEntry:
         if self._llm is None:
             simple = (
                 "AI is not configured (missing GROQ_API_KEY or langchain-groq). Showing fallback reteach:\n\n"
                 + _very_simple_fallback_explanation(topic)
             )
-            self._simplified[topic] = simple
-            return simple
-
-        prompt = f"""
-Re-teach the topic "{topic}" in a VERY SIMPLE way (Feynman style) without losing technical correctness.
-
-Rules:
-- Start with a 1–2 line intuition.
-- Then explain the core idea in 5–10 bullet points.
-- Include 2 engineering/CS examples.
-- End with 3 short self-check questions.
-"""
-        response = self._llm.invoke(prompt)
-        simple = (response.content or "").strip() or _very_simple_fallback_explanation(topic)
-        self._simplified[topic] = simple
-        return simple
+            GENERATED_CONTENT.inc(operation="reteach", source="fallback")
+            return CacheEntry(simple, "fallback", API_RETEACH.version)
+
+        try:
+            response = self._invoke("reteach", API_RETEACH.render(topic=topic))
+        except Exception as exc:
+            _log_llm_failure("reteach", topic, exc)
+            simple = (
+                "AI service is temporarily unavailable. Showing fallback reteach:\n\n"
+                + _very_simple_fallback_explanation(topic)
+            )
+            GENERATED_CONTENT.inc(operation="reteach", source="fallback")
+            return CacheEntry(simple, "fallback", API_RETEACH.version)
+        simple, quality = _repair_text(response)
+        if not simple:
+            simple, quality = _very_simple_fallback_explanation(topic), "fallback"
+        GENERATED_CONTENT.inc(operation="reteach", source=quality)
+        return CacheEntry(simple, quality, API_RETEACH.version)
+
+    def speculate(self, operation: str, topic: str) -> bool:
+        """Generate explain/reteach content for `topic` in the background; False if not scheduled."""
+        if self._circuit.state != CLOSED:
+            # it would only cache fallback text for a topic nobody asked for yet
+            SPECULATIVE_GENERATIONS.inc(operation=operation, result="skipped")
+            return False
+        with self._lock:
+            in_flight = self._flight(operation, canonical_topic(topic)) in self._inflight
+            if in_flight or self.cache_entry(operation, topic) is not None:
+                SPECULATIVE_GENERATIONS.inc(operation=operation, result="skipped")
+                return False
+        if not self._submit_background(self._run_speculation, operation, topic):
+            SPECULATIVE_GENERATIONS.inc(operation=operation, result="dropped")
+            return False
+        SPECULATIVE_GENERATIONS.inc(operation=operation, result="scheduled")
+        return True
+
+    def _run_speculation(self, operation: str, topic: str) -> None:
+        try:
+            (self.explain if operation == "explain" else self.reteach)(topic)
+        except Exception as exc:
+            SPECULATIVE_GENERATIONS.inc(operation=operation, result="failed")
+            print(f"Warning: speculative {operation} for {topic!r} failed: {exc}")
 
     def _fallback_mcqs(self, topic: str, explanation: str) -> List[Dict[str, Any]]:
         basis_hint = (explanation or "").strip()[:160]
@@ -181,81 +647,126 @@ Rules:
         return base[:10]
 
     def generate_quiz(self, topic: str) -> Tuple[List[Dict[str, Any]], int]:
-        explanation = self._explanations.get(topic)
-        if not explanation:
-            explanation = self.explain(topic)
+        quiz = self.quiz_entry(topic).value
+        return quiz["questions"], quiz["relevance_score"]
 
+    def quiz_entry(self, topic: str) -> CacheEntry:
+        """Quiz for `topic` as a CacheEntry of {"questions", "relevance_score"}, cached per explanation."""
+        cached = self.cache_entry("explain", topic)
+        explanation = cached.value if cached is not None else None
+        if not explanation:
+            with span("quiz.explain"):
+                explanation = self.explain(topic)
+            if remaining() == 0:
+                # the explanation used up the budget (and may itself be a fallback)
+                return self._deadline_quiz(topic, explanation)
+
+        key = self._cache_key(self._explanations, topic)[0]
+        basis = hashlib.blake2b(explanation.encode("utf-8"), digest_size=16).hexdigest()
+        with self._lock:
+            stored_basis, variants = self._quizzes.get(key, ("", []))
+            if stored_basis != basis:
+                variants = []
+            variants = [v for v in variants if v.version == API_QUIZ.version and v.is_fresh()]
+            self._quizzes[key] = (basis, variants)
+        if not variants:
+            packed = self._pack_quizzes(topic, explanation)
+            if packed:
+                CACHE_REQUESTS.inc(cache="quizzes", result="miss")
+                GENERATED_CONTENT.inc(operation="quiz", source="pack")
+                with self._lock:
+                    current_basis, current = self._quizzes.get(key, ("", []))
+                    if current_basis == basis and not current:
+                        current.extend(packed)
+                    CACHE_ENTRIES.set(len(self._quizzes), cache="quizzes")
+                return random.choice(packed)
+        # pack variants are the whole set for their explanation; no LLM variants are added to them
+        full = len(variants) >= self.quiz_variants or any(v.quality == "pack" for v in variants)
+        if full:
+            CACHE_REQUESTS.inc(cache="quizzes", result="hit")
+            return random.choice(variants)
+        CACHE_REQUESTS.inc(cache="quizzes", result="miss")
+
+        def generate() -> CacheEntry:
+            questions, relevance, source = self._generate_quiz(topic, explanation)
+            entry = CacheEntry({"questions": questions, "relevance_score": relevance}, source, API_QUIZ.version)
+            with self._lock:
+                current_basis, current = self._quizzes.get(key, ("", []))
+                if current_basis == basis:
+                    current.append(entry)
+                CACHE_ENTRIES.set(len(self._quizzes), cache="quizzes")
+            return entry
+
+        # concurrent misses share one generation per missing variant
+        try:
+            return self._single_flight(("quiz", API_QUIZ.version, f"{key}{basis}{len(variants)}"), generate)
+        except DeadlineExceeded:
+            # a variant already cached for this explanation beats the fallback quiz
+            if variants:
+                return random.choice(variants)
+            return self._deadline_quiz(topic, explanation)
+
+    def _deadline_quiz(self, topic: str, explanation: str) -> CacheEntry:
+        DEADLINES_EXCEEDED.inc(operation="quiz")
+        mcqs = self._fallback_mcqs(topic, explanation)
+        quiz = {"questions": mcqs, "relevance_score": _lexical_relevance_score(explanation, mcqs)}
+        return CacheEntry(quiz, "fallback", API_QUIZ.version)
+
+    def _pack_quizzes(self, topic: str, explanation: str) -> List[CacheEntry]:
+        """Every complete pack quiz for `topic` as a quiz CacheEntry; empty when the pack has none to offer."""
+        # Pack quizzes were generated from the pack explanation, so only use them together
+        # (and only while they match the current quiz prompt; pack quizzes are not migrated).
+        if self._pack is None or not self._pack.is_current(QUIZ) or explanation != self._pack.explanation(topic):
+            return []
+        entries = []
+        for quiz in self._pack.quizzes(topic):
+            questions = _clean_mcqs(quiz)
+            if len(questions) == 10:
+                quiz_value = {"questions": questions, "relevance_score": _lexical_relevance_score(explanation, questions)}
+                entries.append(CacheEntry(quiz_value, "pack", API_QUIZ.version))
+        return entries
+
+    def _generate_quiz(self, topic: str, explanation: str) -> Tuple[List[Dict[str, Any]], int, str]:
+        """(questions, relevance score, source) where source is "llm" or "fallback"."""
         if self._llm is None:
+            GENERATED_CONTENT.inc(operation="quiz", source="fallback")
             mcqs = self._fallback_mcqs(topic, explanation)
-            return mcqs, self.compute_relevance_score(explanation, mcqs)
-
-        prompt = f"""
-You MUST generate MCQs ONLY from the explanation text provided below. Do NOT use outside facts.
-
-Topic: "{topic}"
-
-Explanation text (the ONLY source):
-<BEGIN_EXPLANATION>
-{explanation}
-<END_EXPLANATION>
-
-Task: Generate EXACTLY 10 multiple-choice questions (MCQs) derived ONLY from the explanation text.
-
-Rules:
-- Exactly 10 questions.
-- Each question MUST have exactly 4 options.
-- Only ONE option is correct.
-- Keep questions medium difficulty (engineering undergrad).
-- Avoid ambiguous wording.
-- Do not ask anything not explicitly stated or clearly implied in the explanation.
-
-Return STRICT JSON ONLY (no markdown, no extra text) in this schema:
-{{
-  "questions": [
-    {{
-      "question": "string",
-      "options": ["string", "string", "string", "string"],
-      "answer_index": 0
-    }}
-  ]
-}}
-"""
-        response = self._llm.invoke(prompt)
+            return mcqs, self.compute_relevance_score(explanation, mcqs), "fallback"
+
+        prompt = API_QUIZ.render(topic=topic, explanation=explanation)
+        try:
+            response = self._invoke("quiz", prompt)
+        except Exception as exc:
+            _log_llm_failure("quiz", topic, exc)
+            GENERATED_CONTENT.inc(operation="quiz", source="fallback")
+            # lexical score: another LLM call would only fail (or wait) the same way
+            mcqs = self._fallback_mcqs(topic, explanation)
+            return mcqs, _lexical_relevance_score(explanation, mcqs), "fallback"
         raw = (response.content or "").strip()
         data = _safe_json_load(_extract_json_object(raw))
-        questions = (data or {}).get("questions") if isinstance(data, dict) else None
+        questions = (data.get("mcqs") or data.get("questions")) if isinstance(data, dict) else None
         if not isinstance(questions, list) or len(questions) != 10:
+            GENERATED_CONTENT.inc(operation="quiz", source="fallback")
             mcqs = self._fallback_mcqs(topic, explanation)
-            return mcqs, self.compute_relevance_score(explanation, mcqs)
-
-        cleaned: List[Dict[str, Any]] = []
-        for item in questions:
-            if not isinstance(item, dict):
-                continue
-            q = str(item.get("question", "")).strip()
-            opts = item.get("options", [])
-            ans = item.get("answer_index", None)
-            if not q or not isinstance(opts, list) or len(opts) != 4:
-                continue
-            try:
-                ans_i = int(ans)
-            except Exception:
-                continue
-            if ans_i < 0 or ans_i > 3:
-                continue
-            cleaned.append({"question": q, "options": [str(o).strip() for o in opts], "answer_index": ans_i})
+            return mcqs, self.compute_relevance_score(explanation, mcqs), "fallback"
 
+        cleaned = _clean_mcqs(questions)
         if len(cleaned) != 10:
+            GENERATED_CONTENT.inc(operation="quiz", source="fallback")
             mcqs = self._fallback_mcqs(topic, explanation)
-            return mcqs, self.compute_relevance_score(explanation, mcqs)
+            return mcqs, self.compute_relevance_score(explanation, mcqs), "fallback"
 
-        return cleaned, self.compute_relevance_score(explanation, cleaned)
+        GENERATED_CONTENT.inc(operation="quiz", source="llm")
+        return cleaned, self.compute_relevance_score(explanation, cleaned), "llm"
 
     def compute_relevance_score(self, explanation: str, questions: List[Dict[str, Any]]) -> int:
         if not explanation or not questions:
             return 0
 
-        if self._llm is not None:
+        if self._llm is not None and not fits(self._hedger.delay("relevance") or DEFAULT_STEP_SECONDS):
+            # optional step: the lexical estimate is instant
+            DEADLINE_SKIPPED_STEPS.inc(step="relevance")
+        elif self._llm is not None:
             try:
                 formatted = "\n".join(
                     [
@@ -263,43 +774,15 @@ Return STRICT JSON ONLY (no markdown, no extra text) in this schema:
                         for i, q in enumerate(questions[:10])
                     ]
                 )
-                prompt = f"""
-Evaluate how well these MCQs are grounded ONLY in the provided explanation.
-Return one integer 0-100 representing the percentage of questions that can be
-answered directly from the explanation text.
-
-Explanation:
-<BEGIN_EXPLANATION>
-{explanation}
-<END_EXPLANATION>
-
-MCQs:
-{formatted}
-
-Return only the integer percentage (no words).
-"""
-                response = self._llm.invoke(prompt)
+                prompt = API_RELEVANCE.render(explanation=explanation, mcqs=formatted)
+                response = self._invoke("relevance", prompt)
                 digits = "".join(filter(str.isdigit, (response.content or "")))
                 if digits:
+                    GENERATED_CONTENT.inc(operation="relevance", source="llm")
                     return max(0, min(100, int(digits)))
             except Exception:
                 pass
 
-        exp_tokens = _tokenize(explanation)
-        if not exp_tokens:
-            return 50
-
-        overlaps: List[float] = []
-        for q in questions:
-            mcq_text = (q.get("question", "") or "") + " " + " ".join(q.get("options", []) or [])
-            mcq_tokens = _tokenize(mcq_text)
-            if not mcq_tokens:
-                continue
-            overlaps.append(len(mcq_tokens & exp_tokens) / max(1, len(mcq_tokens)))
-
-        if not overlaps:
-            return 50
-
-        avg = sum(overlaps) / len(overlaps)
-        return max(0, min(100, int((0.35 + avg) * 100)))
+        GENERATED_CONTENT.inc(operation="relevance", source="fallback")
+        return _lexical_relevance_score(explanation, questions)
 
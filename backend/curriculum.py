@@ -0,0 +1,23 @@
+"""Checkpoint topics offered by the web client, in learning order (mirrors LearnPage.jsx)."""
+
+from typing import Dict, Optional
+
+CURRICULUM_TOPICS = [
+    "Artificial Intelligence",
+    "Machine Learning",
+    "Deep Learning",
+    "Neural Networks",
+    "Natural Language Processing",
+    "Computer Vision",
+    "Reinforcement Learning",
+    "Generative AI",
+    "Transformers",
+    "Diffusion Models",
+]
+
+_NEXT_TOPIC: Dict[str, str] = dict(zip(CURRICULUM_TOPICS, CURRICULUM_TOPICS[1:]))
+
+
+def next_topic(topic: str) -> Optional[str]:
+    """Topic after `topic` in the curriculum, or None at the end / for free-form topics."""
+    return _NEXT_TOPIC.get(topic)
@@ -1,12 +1,138 @@
 import os
+from typing import Any, Dict, Optional
+
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from metrics import (
+    MONGO_COMMAND_DURATION,
+    MONGO_COMMAND_FAILURES,
+    MONGO_POOL_CHECKOUT_DURATION,
+    MONGO_POOL_CHECKOUT_FAILURES,
+    MONGO_POOL_CONNECTIONS,
+    MONGO_POOL_MAX_SIZE,
+)
 
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = "autonomous_learning_agent"
 
-client = AsyncIOMotorClient(MONGODB_URL)
-database = client[DATABASE_NAME]
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Feeds MongoDB command latencies into the /metrics histograms."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1e6, command=event.command_name)
+        MONGO_COMMAND_FAILURES.inc(command=event.command_name)
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Open / in-use / waiting connections per server, checkout latency and failures (pool exhaustion)."""
+
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+
+    @staticmethod
+    def _address(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def pool_created(self, event):
+        MONGO_POOL_MAX_SIZE.set(self.max_pool_size)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.inc(address=self._address(event), state="open")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.dec(address=self._address(event), state="open")
+
+    def connection_check_out_started(self, event):
+        MONGO_POOL_CONNECTIONS.inc(address=self._address(event), state="waiting")
+
+    def connection_check_out_failed(self, event):
+        MONGO_POOL_CONNECTIONS.dec(address=self._address(event), state="waiting")
+        MONGO_POOL_CHECKOUT_DURATION.observe(event.duration)
+        MONGO_POOL_CHECKOUT_FAILURES.inc(reason=event.reason)
+
+    def connection_checked_out(self, event):
+        address = self._address(event)
+        MONGO_POOL_CONNECTIONS.dec(address=address, state="waiting")
+        MONGO_POOL_CONNECTIONS.inc(address=address, state="in_use")
+        MONGO_POOL_CHECKOUT_DURATION.observe(event.duration)
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CONNECTIONS.dec(address=self._address(event), state="in_use")
+
+
+def pool_settings() -> Dict[str, Any]:
+    """Client pool/timeout options from the environment (read at call time, after .env is loaded)."""
+    settings = {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "2")),
+        "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+        "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000")),
+    }
+    wait_queue_timeout = os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+    if wait_queue_timeout:
+        settings["waitQueueTimeoutMS"] = int(wait_queue_timeout)
+    return settings
+
+
+def create_client(url: Optional[str] = None, **overrides: Any) -> AsyncIOMotorClient:
+    """Motor client with the app's pool settings and metrics listeners (also used by the helper scripts)."""
+    settings = {**pool_settings(), **overrides}
+    listeners = [CommandMetricsListener(), PoolMetricsListener(settings["maxPoolSize"])]
+    return AsyncIOMotorClient(url or os.getenv("MONGODB_URL", MONGODB_URL), event_listeners=listeners, **settings)
+
+
+# Created by connect_database() after startup, or on first use, so importing the app never waits on the driver.
+client = None
+database = None
 
 
 def get_database():
+    global client, database
+    if database is None:
+        client = create_client()
+        database = client[DATABASE_NAME]
     return database
+
+
+async def connect_database() -> None:
+    """Create the client and ping, so the first requests find a connected pool (minPoolSize fills the rest)."""
+    if database is not None and client is None:
+        # a stand-in database injected by tests/benchmarks
+        return
+    get_database()
+    try:
+        await client.admin.command("ping")
+    except Exception as exc:
+        # the driver keeps retrying in the background; requests surface errors until it connects
+        print(f"Warning: MongoDB warm-up ping failed: {exc}")
+
+
+def close_database() -> None:
+    global client, database
+    if client is not None:
+        client.close()
+        client = None
+        database = None
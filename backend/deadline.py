@@ -0,0 +1,51 @@
+"""
+Request deadlines.
+
+An endpoint sets its latency budget with `with deadline(seconds):`. The
+absolute deadline lives in a ContextVar, so the ContextManager calls made
+while serving the request (and hedged LLM attempts, which run in a copy of
+the caller's context) see the same limit and ask `remaining()` how long they
+may still wait. Nested deadlines can only shorten it. Background work
+(speculation, refreshes, prompt migration) runs on threads of its own and
+has no deadline.
+
+Standard library only, so the Streamlit app can import it as `backend.deadline`.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's latency budget ran out before a result was ready."""
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Bound everything in the block to `seconds` from now (None or <= 0: no limit of its own)."""
+    if seconds is None or seconds <= 0:
+        yield
+        return
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(current, at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None when there is none."""
+    at = _deadline.get()
+    return None if at is None else max(0.0, at - time.monotonic())
+
+
+def fits(seconds: float) -> bool:
+    """Whether a step expected to take `seconds` can still finish before the deadline."""
+    left = remaining()
+    return left is None or left >= seconds
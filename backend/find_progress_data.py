@@ -1,13 +1,13 @@
 import asyncio
 import os
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
+from database import create_client
 
 load_dotenv()
 
 async def find_all_progress_data():
     mongodb_url = os.getenv("MONGODB_URL")
-    client = AsyncIOMotorClient(mongodb_url)
+    client = create_client(mongodb_url, minPoolSize=0)
     
     print("🔍 Searching ALL databases for progress data...")
     print("=" * 70)
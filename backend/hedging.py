@@ -0,0 +1,160 @@
+"""
+Hedged LLM requests.
+
+Provider latency has a long tail: most calls finish near the median, a few
+take several times longer. When a call is still running after the rolling
+`quantile` (p90 by default) of recent latencies for its operation, a duplicate
+request is sent and whichever finishes first is returned. Extra requests are
+capped by a token bucket: every call earns `budget` tokens (0.1 = at most ~10%
+more requests), a hedge spends one.
+
+Calls are plain blocking invoke() calls, so an attempt that loses the race
+cannot be aborted mid-request; its result is discarded when it arrives (and
+its connection goes back to the shared pool). Only a hedge that has not
+started yet is cancelled.
+
+Off unless LLM_HEDGE_ENABLED=1; latencies are tracked either way, and
+ContextManager uses the same p90 to decide whether an optional step still fits
+a request's deadline. One policy (llm_hedger()) is shared by every
+client in the process. Standard library only, so the Streamlit app can import
+it as `backend.hedging`.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+try:
+    from metrics import LLM_HEDGE_CALLS, LLM_HEDGE_DELAY, LLM_HEDGE_WINS
+except ImportError:  # imported as backend.hedging from the project root
+    from backend.metrics import LLM_HEDGE_CALLS, LLM_HEDGE_DELAY, LLM_HEDGE_WINS
+
+
+class HedgePolicy:
+    def __init__(
+        self,
+        enabled: bool = False,
+        quantile: float = 0.9,
+        window: int = 200,
+        min_samples: int = 20,
+        budget: float = 0.1,
+        max_tokens: float = 10.0,
+        max_workers: int = 64,
+    ):
+        self.enabled = enabled
+        self.quantile = quantile
+        self.window = window
+        self.min_samples = min_samples
+        self.budget = budget
+        self.max_tokens = max_tokens
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        # operation -> latencies (s) of the most recent first attempts
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._tokens = max_tokens
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        return cls(
+            enabled=os.getenv("LLM_HEDGE_ENABLED", "0") == "1",
+            quantile=float(os.getenv("LLM_HEDGE_QUANTILE", "0.9")),
+            window=int(os.getenv("LLM_HEDGE_WINDOW", "200")),
+            min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+            budget=float(os.getenv("LLM_HEDGE_BUDGET", "0.1")),
+            # attempts run on this pool; the shared HTTP pool caps actual concurrency anyway
+            max_workers=2 * int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "32")),
+        )
+
+    def delay(self, operation: str) -> Optional[float]:
+        """Seconds to wait before hedging `operation` (its recent p90), or None while there are too few samples."""
+        with self._lock:
+            samples = self._latencies.get(operation)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))]
+
+    def call(self, operation: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """fn(*args, **kwargs), hedged with a second attempt if it runs past the operation's delay."""
+        delay = self.delay(operation) if self.enabled else None
+        if delay is None:
+            if self.enabled:
+                LLM_HEDGE_CALLS.inc(operation=operation, outcome="no_estimate")
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            self._observe(operation, time.perf_counter() - start)
+            return result
+        LLM_HEDGE_DELAY.set(delay, operation=operation)
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.budget)
+
+        start = time.perf_counter()
+
+        def observe(attempt: Future) -> None:
+            # the first attempt's own latency feeds the estimate, whether or not a hedge wins
+            if attempt.exception() is None:
+                self._observe(operation, time.perf_counter() - start)
+
+        primary = self._submit(fn, *args, **kwargs)
+        primary.add_done_callback(observe)
+        if wait([primary], timeout=delay).done:
+            LLM_HEDGE_CALLS.inc(operation=operation, outcome="not_needed")
+            return primary.result()
+        if not self._take_token():
+            LLM_HEDGE_CALLS.inc(operation=operation, outcome="over_budget")
+            return primary.result()
+
+        LLM_HEDGE_CALLS.inc(operation=operation, outcome="hedged")
+        hedge = self._submit(fn, *args, **kwargs)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for winner in done:
+                if winner.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    LLM_HEDGE_WINS.inc(operation=operation, winner="primary" if winner is primary else "hedge")
+                    return winner.result()
+        # both attempts failed: surface the first attempt's error
+        return primary.result()
+
+    def _submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="llm-hedge")
+        # each attempt runs in a copy of the caller's context (trace spans, request-scoped variables)
+        return self._executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def _observe(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._latencies.get(operation)
+            if samples is None:
+                samples = self._latencies[operation] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+
+_hedger: Optional[HedgePolicy] = None
+_hedger_lock = threading.Lock()
+
+
+def llm_hedger() -> HedgePolicy:
+    """The process-wide hedging policy for LLM calls (settings from LLM_HEDGE_*, read on first use)."""
+    global _hedger
+    if _hedger is None:
+        with _hedger_lock:
+            if _hedger is None:
+                _hedger = HedgePolicy.from_env()
+    return _hedger
@@ -0,0 +1,145 @@
+import importlib.util
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+
+def langchain_groq_available() -> bool:
+    """Cheap check that langchain-groq is installed, without importing it."""
+    return importlib.util.find_spec("langchain_groq") is not None
+
+
+# =============================
+# Shared HTTP connection pool
+# =============================
+# The Groq SDK would otherwise build its own httpx client per ChatGroq instance with a
+# 5 s keep-alive expiry, so after a short pause every call paid DNS + TCP + TLS again.
+# One pool is shared by every client in the process (both context managers, pack builder
+# workers); idle connections are kept for LLM_HTTP_KEEPALIVE_SECONDS.
+_http_client: Optional[Any] = None
+_http_lock = threading.Lock()
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def http_pool_settings() -> dict:
+    return {
+        "max_connections": int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "32")),
+        "max_keepalive_connections": int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "16")),
+        "keepalive_expiry": float(os.getenv("LLM_HTTP_KEEPALIVE_SECONDS", "120")),
+        "http2": os.getenv("LLM_HTTP2", "1") == "1" and http2_available(),
+        "timeout": float(os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "60")),
+        "connect_timeout": float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT_SECONDS", "5")),
+    }
+
+
+def build_http_client(verify: Any = True, **overrides: Any) -> Any:
+    """httpx.Client configured from http_pool_settings() (httpx ships with the groq SDK)."""
+    import httpx
+
+    settings = {**http_pool_settings(), **overrides}
+    return httpx.Client(
+        verify=verify,
+        http2=settings["http2"],
+        limits=httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_keepalive_connections"],
+            keepalive_expiry=settings["keepalive_expiry"],
+        ),
+        timeout=httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"]),
+    )
+
+
+def shared_http_client() -> Any:
+    global _http_client
+    if _http_client is None:
+        with _http_lock:
+            if _http_client is None:
+                _http_client = build_http_client()
+    return _http_client
+
+
+def prewarm_http_pool(base_url: Optional[str] = None, connections: Optional[int] = None) -> int:
+    """Open `connections` (LLM_HTTP_PREWARM_CONNECTIONS) pooled connections to the provider; returns how many."""
+    count = int(os.getenv("LLM_HTTP_PREWARM_CONNECTIONS", "2")) if connections is None else connections
+    if count <= 0:
+        return 0
+    # same variable the groq SDK reads
+    base_url = base_url or os.getenv("GROQ_BASE_URL") or "https://api.groq.com"
+    client = shared_http_client()
+
+    def touch(_: int) -> bool:
+        # any response leaves the TLS connection in the pool; the status does not matter
+        try:
+            client.head(base_url)
+            return True
+        except Exception as exc:
+            print(f"Warning: LLM connection pre-warm failed: {exc}")
+            return False
+
+    # concurrent requests, so the pool opens several connections instead of reusing one
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return sum(pool.map(touch, range(count)))
+
+
+def close_http_pool() -> None:
+    global _http_client
+    with _http_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+
+class LLMClient:
+    """ChatGroq wrapper that defers the LangChain import and client construction to first use.
+
+    Importing `langchain_groq` pulls in most of langchain-core and accounts for
+    about half of the backend's import time, so the app can bind its port and
+    answer health checks before the client exists. `warm_up()` builds it ahead
+    of the first real call (e.g. from a background task after startup).
+    """
+
+    def __init__(self, model: str, temperature: float, api_key: str):
+        self.model = model
+        self.temperature = temperature
+        self._api_key = api_key
+        self._client: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._client is not None
+
+    def _get_client(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from langchain_groq import ChatGroq
+
+                    self._client = ChatGroq(
+                        model=self.model,
+                        temperature=self.temperature,
+                        groq_api_key=self._api_key,
+                        http_client=shared_http_client(),
+                        # ChatGroq sends its own (default: no) timeout with every request, overriding the pool's
+                        request_timeout=shared_http_client().timeout,
+                    )
+        return self._client
+
+    def warm_up(self) -> None:
+        """Build the client and open pooled connections to the provider."""
+        self._get_client()
+        prewarm_http_pool()
+
+    def invoke(self, prompt: str, **kwargs: Any) -> Any:
+        return self._get_client().invoke(prompt, **kwargs)
+
+
+def build_llm_client(model: str, temperature: float) -> Optional[LLMClient]:
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key or not langchain_groq_available():
+        return None
+    return LLMClient(model=model, temperature=temperature, api_key=api_key)
@@ -1,8 +1,12 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import Any, AsyncIterator, Callable, List, Optional
 
-from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel, Field
 
@@ -13,12 +17,40 @@ from auth import (
     get_password_hash,
     verify_password,
 )
-from context_manager import ContextManager
-from database import get_database
+from compression import CompressionMiddleware
+from context_manager import CacheEntry, ContextManager
+from curriculum import next_topic
+from database import close_database, connect_database, get_database
+from deadline import deadline
+from llm import close_http_pool
+from metrics import REGISTRY, MetricsMiddleware
 from models import Token, UserCreate
+from profiling import ProfilingMiddleware, profiled
+from responses import APIJSONResponse, EncodedBody, encode_model, encoded_response
+from tracing import TracingMiddleware, span
 
 
-app = FastAPI(title="Autonomous Learning Agent API")
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Warm up the LLM client and Mongo pool in the background once the port is bound; close both pools on shutdown."""
+    warm_up_task = None
+    if WARM_UP_ON_STARTUP:
+
+        async def _warm():
+            await asyncio.gather(asyncio.to_thread(context_manager.warm_up), connect_database())
+
+        # not awaited: serving starts right away, off the warm-up's critical path
+        warm_up_task = asyncio.create_task(_warm())
+    try:
+        yield
+    finally:
+        if warm_up_task is not None and not warm_up_task.done():
+            warm_up_task.cancel()
+        close_database()
+        close_http_pool()
+
+
+app = FastAPI(title="Autonomous Learning Agent API", default_response_class=APIJSONResponse, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,10 +59,27 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(ProfilingMiddleware)
 
 
 context_manager = ContextManager()
 
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "1") == "1"
+# Seconds a browser may reuse GET /explain and GET /reteach responses (private: they need the user's token).
+CONTENT_MAX_AGE = int(os.getenv("CONTENT_MAX_AGE", "3600"))
+# Latency budgets (seconds) for the learning endpoints. When one runs out the request gets the best cached or
+# fallback content while the generation finishes in the background and fills the cache. 0 = no limit.
+BUDGETS = {
+    "explain": float(os.getenv("EXPLAIN_BUDGET_SECONDS", "8")),
+    "quiz": float(os.getenv("QUIZ_BUDGET_SECONDS", "12")),
+    "reteach": float(os.getenv("RETEACH_BUDGET_SECONDS", "8")),
+}
+
+
+
 
 class ExplainRequest(BaseModel):
     topic: str = Field(..., min_length=2)
@@ -65,6 +114,7 @@ class EvaluateResponse(BaseModel):
     score: int = Field(..., ge=0, le=100)
     attempt_number: int
     max_attempts_reached: bool
+    next_topic: Optional[str] = None
 
 
 class ReteachRequest(BaseModel):
@@ -77,12 +127,21 @@ class ReteachResponse(BaseModel):
 
 @app.get("/")
 def health():
+    circuit = context_manager.circuit_info()
     return {
-        "status": "ok",
+        # degraded: the LLM circuit is open (or probing), learning content comes from caches and fallbacks
+        "status": "ok" if circuit["state"] == "closed" else "degraded",
         "llm_configured": context_manager.has_llm(),
+        "llm_circuit": circuit,
+        "content_pack": context_manager.pack_info(),
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 # ============ Authentication Endpoints ============
 
 
@@ -97,7 +156,8 @@ async def register(user: UserCreate):
             detail="Email already registered"
         )
 
-    hashed_password = get_password_hash(user.password)
+    with span("auth.hash"):
+        hashed_password = get_password_hash(user.password)
 
     user_dict = {
         "email": user.email,
@@ -114,8 +174,11 @@ async def register(user: UserCreate):
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     db = get_database()
 
-    user = await db.users.find_one({"email": form_data.username})
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    with span("db.find_user"):
+        user = await db.users.find_one({"email": form_data.username})
+    with span("auth.verify"):
+        password_ok = bool(user) and verify_password(form_data.password, user["hashed_password"])
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -138,58 +201,99 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
 async def get_progress(current_user: dict = Depends(get_current_user)):
     db = get_database()
 
-    progress_records = await db.progress.find(
-        {"user_id": str(current_user["_id"])}
-    ).sort("date", -1).to_list(length=100)
+    with span("db.progress"):
+        progress_records = await db.progress.find(
+            {"user_id": str(current_user["_id"])}
+        ).sort("date", -1).to_list(length=100)
 
-    for record in progress_records:
-        record["_id"] = str(record["_id"])
-
-    return {"progress": progress_records}
+    # returned directly: orjson writes ObjectId/datetime values without a jsonable_encoder pass
+    return APIJSONResponse({"progress": progress_records})
 
 
 # ============ Learning Endpoints (Protected) ============
+# The handlers that call the ContextManager are plain functions: it blocks (LLM calls, waiting on another
+# request's generation), so FastAPI runs them on its threadpool instead of the event loop. Each call gets a
+# copy of the request context, which is where its deadline lives. @profiled makes a profiled request sample
+# that worker thread as well as the event loop.
+
+
+def _encoded(entry: CacheEntry, build: Callable[[Any], BaseModel]) -> EncodedBody:
+    # Validated and serialized once per cache entry; later hits send the stored bytes as-is.
+    if entry.encoded is None:
+        entry.encoded = encode_model(build(entry.value))
+    return entry.encoded
+
+
+def _cache_control(entry: CacheEntry) -> dict:
+    # The requests are authenticated, so only the user's own browser may keep the body; shared caches
+    # (a CDN, proxies) must not serve it to requests that never presented the token.
+    # Fallback text is replaced as soon as the LLM answers, so caches must revalidate it every time.
+    if entry.quality == "fallback":
+        return {"Cache-Control": "no-cache"}
+    return {"Cache-Control": f"private, max-age={CONTENT_MAX_AGE}, stale-while-revalidate=60"}
 
 
 @app.post("/explain", response_model=ExplainResponse)
-async def explain(req: ExplainRequest, current_user: dict = Depends(get_current_user)):
-    explanation = context_manager.explain(req.topic)
-    return ExplainResponse(explanation=explanation)
+@profiled
+def explain(req: ExplainRequest, request: Request, current_user: dict = Depends(get_current_user)):
+    with deadline(BUDGETS["explain"]):
+        entry = context_manager.explain_entry(req.topic)
+    return encoded_response(request, _encoded(entry, lambda text: ExplainResponse(explanation=text)))
+
+
+@app.get("/explain", response_model=ExplainResponse)
+@profiled
+def explain_cacheable(
+    request: Request, topic: str = Query(..., min_length=2), current_user: dict = Depends(get_current_user)
+):
+    """Cacheable variant of POST /explain: ETag + If-None-Match (304) and Cache-Control."""
+    with deadline(BUDGETS["explain"]):
+        entry = context_manager.explain_entry(topic)
+    body = _encoded(entry, lambda text: ExplainResponse(explanation=text))
+    return encoded_response(request, body, _cache_control(entry))
 
 
 @app.post("/generate-quiz", response_model=GenerateQuizResponse)
-async def generate_quiz(req: GenerateQuizRequest, current_user: dict = Depends(get_current_user)):
-    questions, _relevance = context_manager.generate_quiz(req.topic)
+@profiled
+def generate_quiz(req: GenerateQuizRequest, request: Request, current_user: dict = Depends(get_current_user)):
+    with deadline(BUDGETS["quiz"]):
+        entry = context_manager.quiz_entry(req.topic)
 
-    if len(questions) != 10:
+    if len(entry.value["questions"]) != 10:
         raise HTTPException(status_code=500, detail="Quiz generation did not produce exactly 10 questions")
 
-    return GenerateQuizResponse(questions=questions, relevance_score=100)
+    body = _encoded(entry, lambda quiz: GenerateQuizResponse(questions=quiz["questions"], relevance_score=100))
+    return encoded_response(request, body)
 
 
-@app.post("/evaluate", response_model=EvaluateResponse)
-async def evaluate(req: EvaluateRequest, current_user: dict = Depends(get_current_user)):
-    if len(req.answers) != len(req.correct_answers):
+def score_answers(answers: List[int], correct_answers: List[int]) -> int:
+    if len(answers) != len(correct_answers):
         raise HTTPException(status_code=400, detail="answers and correct_answers length mismatch")
-    if len(req.answers) != 10:
+    if len(answers) != 10:
         raise HTTPException(status_code=400, detail="Expected exactly 10 answers")
 
     correct = 0
-    for user_ans, correct_ans in zip(req.answers, req.correct_answers):
+    for user_ans, correct_ans in zip(answers, correct_answers):
         if not (0 <= user_ans <= 3) or not (0 <= correct_ans <= 3):
             raise HTTPException(status_code=400, detail="Answer indices must be between 0 and 3")
         if user_ans == correct_ans:
             correct += 1
 
-    score = int((correct / 10) * 100)
+    return int((correct / 10) * 100)
+
+
+@app.post("/evaluate", response_model=EvaluateResponse)
+async def evaluate(req: EvaluateRequest, current_user: dict = Depends(get_current_user)):
+    score = score_answers(req.answers, req.correct_answers)
 
     db = get_database()
     user_id = str(current_user["_id"])
 
-    existing_attempts = await db.progress.count_documents({
-        "user_id": user_id,
-        "topic": req.topic
-    })
+    with span("db.count_attempts"):
+        existing_attempts = await db.progress.count_documents({
+            "user_id": user_id,
+            "topic": req.topic
+        })
 
     attempt_number = existing_attempts + 1
 
@@ -207,18 +311,42 @@ async def evaluate(req: EvaluateRequest, current_user: dict = Depends(get_curren
         "date": datetime.now(timezone.utc)
     }
 
-    await db.progress.insert_one(progress_record)
+    with span("db.insert_progress"):
+        await db.progress.insert_one(progress_record)
 
     max_attempts_reached = (attempt_number == 3 and score < 70)
 
+    # The result decides the client's next call (fail -> /reteach, pass -> next topic's /explain),
+    # so start generating it now; the follow-up request then joins it or hits the cache.
+    upcoming = next_topic(req.topic) if score >= 70 else None
+    if score < 70 and not max_attempts_reached:
+        context_manager.speculate("reteach", req.topic)
+    elif upcoming:
+        context_manager.speculate("explain", upcoming)
+
     return EvaluateResponse(
         score=score,
         attempt_number=attempt_number,
-        max_attempts_reached=max_attempts_reached
+        max_attempts_reached=max_attempts_reached,
+        next_topic=upcoming,
     )
 
 
 @app.post("/reteach", response_model=ReteachResponse)
-async def reteach(req: ReteachRequest, current_user: dict = Depends(get_current_user)):
-    simplified = context_manager.reteach(req.topic)
-    return ReteachResponse(simplified_explanation=simplified)
+@profiled
+def reteach(req: ReteachRequest, request: Request, current_user: dict = Depends(get_current_user)):
+    with deadline(BUDGETS["reteach"]):
+        entry = context_manager.reteach_entry(req.topic)
+    return encoded_response(request, _encoded(entry, lambda text: ReteachResponse(simplified_explanation=text)))
+
+
+@app.get("/reteach", response_model=ReteachResponse)
+@profiled
+def reteach_cacheable(
+    request: Request, topic: str = Query(..., min_length=2), current_user: dict = Depends(get_current_user)
+):
+    """Cacheable variant of POST /reteach."""
+    with deadline(BUDGETS["reteach"]):
+        entry = context_manager.reteach_entry(topic)
+    body = _encoded(entry, lambda text: ReteachResponse(simplified_explanation=text))
+    return encoded_response(request, body, _cache_control(entry))
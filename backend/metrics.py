@@ -0,0 +1,326 @@
+"""
+Tiny in-process metrics registry rendered in the Prometheus text format.
+
+Counters, gauges and histograms keep their samples in plain dicts keyed by
+label tuples behind a per-metric lock, so recording a sample on the request
+path is a dict update plus (for histograms) a bisect over the buckets.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 1.5, 2.5, 5.0, 7.5, 10.0, 20.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float], **labels: str) -> None:
+        """Evaluate `fn` at scrape time instead of storing a value."""
+        with self._lock:
+            self._functions[self._key(labels)] = fn
+
+    def value(self, **labels: str) -> float:
+        key = self._key(labels)
+        fn = self._functions.get(key)
+        return fn() if fn else self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+            functions = list(self._functions.items())
+        lines = [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+        for key, fn in functions:
+            try:
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(fn())}")
+            except Exception:
+                continue
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[idx] += 1
+            self._sums[key] += value
+
+    def time(self, **labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def count(self, **labels: str) -> int:
+        return sum(self._counts.get(self._key(labels), []))
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(c), self._sums[k]) for k, c in self._counts.items()]
+        lines: List[str] = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(
+    name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# ============ Application metrics ============
+
+HTTP_REQUEST_DURATION = histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_FLIGHT = gauge("http_requests_in_flight", "HTTP requests currently being served.")
+
+LLM_REQUEST_DURATION = histogram(
+    "llm_request_duration_seconds", "LLM call latency by operation.", ["operation"], buckets=LLM_BUCKETS
+)
+LLM_TOKENS = counter("llm_tokens_total", "LLM tokens used by operation and direction.", ["operation", "direction"])
+LLM_ERRORS = counter("llm_errors_total", "LLM calls that raised, by operation.", ["operation"])
+GENERATED_CONTENT = counter(
+    "generated_content_total",
+    "Content produced by operation and source (llm, repaired, pack or fallback).",
+    ["operation", "source"],
+)
+
+MONGO_COMMAND_DURATION = histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by command name.", ["command"]
+)
+MONGO_COMMAND_FAILURES = counter("mongo_command_failures_total", "Failed MongoDB commands by command name.", ["command"])
+MONGO_POOL_CONNECTIONS = gauge(
+    "mongo_pool_connections",
+    "MongoDB pool connections by server and state (open, in_use, waiting = operations queued for one).",
+    ["address", "state"],
+)
+MONGO_POOL_MAX_SIZE = gauge("mongo_pool_max_size", "Configured maxPoolSize per MongoDB server.")
+MONGO_POOL_CHECKOUT_DURATION = histogram(
+    "mongo_pool_checkout_duration_seconds", "Time to check a connection out of the MongoDB pool."
+)
+MONGO_POOL_CHECKOUT_FAILURES = counter(
+    "mongo_pool_checkout_failures_total",
+    "Failed MongoDB pool checkouts by reason (timeout = pool exhausted, connectionError, poolClosed).",
+    ["reason"],
+)
+
+CACHE_REQUESTS = counter(
+    "context_cache_requests_total",
+    "ContextManager cache lookups (hit, near_hit, stale, outdated or miss).",
+    ["cache", "result"],
+)
+CACHE_ENTRIES = gauge("context_cache_entries", "Entries held in the ContextManager caches.", ["cache"])
+SPECULATIVE_GENERATIONS = counter(
+    "speculative_generations_total",
+    "Background generations of the likely next content, by operation and result.",
+    ["operation", "result"],
+)
+PROMPT_MIGRATIONS = counter(
+    "prompt_migrations_total",
+    "Background re-generations of content made with an outdated prompt version, by operation and result.",
+    ["operation", "result"],
+)
+PROMPT_MIGRATION_BACKLOG = gauge("prompt_migration_backlog", "Outdated entries waiting to be re-generated.")
+LLM_CIRCUIT_STATE = gauge("llm_circuit_state", "LLM circuit breaker state (0 closed, 1 half-open, 2 open).", ["circuit"])
+LLM_CIRCUIT_TRANSITIONS = counter(
+    "llm_circuit_transitions_total", "LLM circuit breaker state changes by new state.", ["circuit", "state"]
+)
+LLM_CIRCUIT_REJECTED = counter(
+    "llm_circuit_rejected_total", "LLM calls short-circuited while the breaker was open.", ["circuit"]
+)
+LLM_HEDGE_CALLS = counter(
+    "llm_hedge_calls_total",
+    "LLM calls under the hedging policy by outcome (no_estimate, not_needed, hedged, over_budget).",
+    ["operation", "outcome"],
+)
+LLM_HEDGE_WINS = counter(
+    "llm_hedge_wins_total",
+    "Hedged LLM calls by the attempt that finished first (primary or hedge).",
+    ["operation", "winner"],
+)
+LLM_HEDGE_DELAY = gauge(
+    "llm_hedge_delay_seconds", "Current hedge delay (rolling latency quantile) by operation.", ["operation"]
+)
+DEADLINES_EXCEEDED = counter(
+    "deadlines_exceeded_total",
+    "Requests that ran out of their latency budget and were served fallback content, by operation.",
+    ["operation"],
+)
+DEADLINE_SKIPPED_STEPS = counter(
+    "deadline_skipped_steps_total", "Optional steps skipped because they could not fit the remaining budget.", ["step"]
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            )
@@ -5,7 +5,7 @@ This script converts all existing UTC timestamps in the database to IST (Indian
 import asyncio
 import os
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
+from database import DATABASE_NAME, create_client
 from datetime import datetime, timedelta
 import pytz
 
@@ -13,8 +13,8 @@ load_dotenv()
 
 async def migrate_timestamps_to_ist():
     mongodb_url = os.getenv("MONGODB_URL")
-    client = AsyncIOMotorClient(mongodb_url)
-    db = client["autonomous_learning_agent"]
+    client = create_client(mongodb_url, minPoolSize=0)
+    db = client[DATABASE_NAME]
     
     ist = pytz.timezone('Asia/Kolkata')
     utc = pytz.UTC
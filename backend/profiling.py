@@ -0,0 +1,204 @@
+"""
+Opt-in statistical profiling of individual requests.
+
+A request is profiled when it carries `X-Profile: <PROFILE_ADMIN_TOKEN>` or,
+with PROFILE_SAMPLE_RATE > 0, when it is picked by random sampling. While
+it runs, a background thread samples the stacks of the threads serving it
+every PROFILE_INTERVAL_MS and counts the collapsed stacks: the event loop,
+plus every thread that joins the request's profile with profile_thread()
+(sync endpoints decorated with @profiled, which FastAPI runs on its
+threadpool, and the ContextManager's generation workers). The result is written as one flamegraph-ready
+`.folded` file (flamegraph.pl / speedscope / inferno input) per request
+under PROFILE_DIR/<route>/, and the oldest files are deleted whenever the
+directory grows beyond PROFILE_MAX_BYTES. Stopping the sampler, writing the
+file and pruning the directory happen on a background writer thread, never
+on the event loop.
+
+Concurrent requests handled by the same event loop show up in each other's
+samples, so profile on a quiet instance for the cleanest picture.
+"""
+
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional, Set, Tuple
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_BYTES = int(os.getenv("PROFILE_MAX_BYTES", str(50 * 1024 * 1024)))
+PROFILE_HEADER = b"x-profile"
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the Python stacks of a set of threads at a fixed interval from a helper thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_ids: Set[int] = {thread_id}
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def finish(self) -> None:
+        """Stop sampling without waiting for the sampler thread (see stop())."""
+        self._stop.set()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self.thread_ids):
+                frame = frames.get(thread_id)
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                if labels:
+                    self.stacks[";".join(reversed(labels))] += 1
+
+
+# The profiler of the request being served; copied into threadpool calls along with the rest of the context.
+_active: ContextVar[Optional[SamplingProfiler]] = ContextVar("profiler", default=None)
+
+
+@contextmanager
+def profile_thread() -> Iterator[None]:
+    """Sample the current thread into the request's profile (if it is profiled) for the duration of the block."""
+    profiler = _active.get()
+    thread_id = threading.get_ident()
+    if profiler is None or thread_id in profiler.thread_ids:
+        yield
+        return
+    profiler.thread_ids.add(thread_id)
+    try:
+        yield
+    finally:
+        profiler.thread_ids.discard(thread_id)
+
+
+def profiled(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator for sync endpoints: the threadpool worker running them joins the request's profile."""
+
+    @wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with profile_thread():
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _route_slug(route_path: Optional[str]) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", (route_path or "unmatched").strip("/")) or "root"
+
+
+def _enforce_disk_budget(directory: str, max_bytes: int) -> None:
+    files = []
+    for dirpath, _dirnames, filenames in os.walk(directory):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _mtime, size, _path in files)
+    for _mtime, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            continue
+
+
+def write_profile(stacks: Counter, route_path: Optional[str]) -> Optional[str]:
+    if not stacks:
+        return None
+    route_dir = os.path.join(PROFILE_DIR, _route_slug(route_path))
+    os.makedirs(route_dir, exist_ok=True)
+    path = os.path.join(route_dir, f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.folded")
+    with open(path, "w", encoding="utf-8") as fh:
+        for stack, count in stacks.most_common():
+            fh.write(f"{stack} {count}\n")
+    _enforce_disk_budget(PROFILE_DIR, PROFILE_MAX_BYTES)
+    return path
+
+
+_write_queue: "queue.SimpleQueue[Tuple[SamplingProfiler, Optional[str]]]" = queue.SimpleQueue()
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+
+def _ensure_writer() -> None:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_write_profiles, name="profile-writer", daemon=True)
+                _writer.start()
+
+
+def _write_profiles() -> None:
+    """Join finished samplers and write their profiles, in the order the requests completed."""
+    while True:
+        profiler, route_path = _write_queue.get()
+        try:
+            write_profile(profiler.stop(), route_path)
+        except OSError as exc:
+            print(f"Warning: writing a request profile to {PROFILE_DIR} failed: {exc}")
+
+
+def _should_profile(scope) -> bool:
+    if PROFILE_ADMIN_TOKEN:
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER:
+                return value.decode("latin-1") == PROFILE_ADMIN_TOKEN
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles admin-flagged or randomly sampled requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000).start()
+        token = _active.set(profiler)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _active.reset(token)
+            profiler.finish()
+            _write_queue.put((profiler, getattr(scope.get("route"), "path", None)))
+            _ensure_writer()
@@ -0,0 +1,223 @@
+"""
+Prompt templates of the FastAPI ContextManager (API_*) and the Streamlit/CLI context_manager.
+
+Each app keeps its own wording. Content packs are built by the Streamlit/CLI
+context_manager, so PACK_TEMPLATES are its templates and the backend serves
+pack entries while those are current.
+
+Every template carries a content-hashed `version`. Cached entries and content
+packs record the version they were generated with, so editing a prompt makes
+exactly the content produced by that prompt outdated. The backend then keeps
+serving it while it is regenerated in the background.
+
+Standard library only, so the Streamlit app can import it as `backend.prompts`.
+"""
+
+import hashlib
+from typing import Dict, Iterable
+
+
+class PromptTemplate:
+    """A str.format template (literal braces doubled) with a version derived from its text."""
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.text = text
+        self.version = hashlib.sha256(f"{name}\n{text}".encode("utf-8")).hexdigest()[:10]
+
+    def render(self, **fields: str) -> str:
+        return self.text.format(**fields)
+
+    def __repr__(self) -> str:
+        return f"PromptTemplate({self.name!r}, version={self.version!r})"
+
+
+# =============================
+# FastAPI backend (backend/context_manager.py)
+# =============================
+API_EXPLAIN = PromptTemplate(
+    "api_explain",
+    """
+You are a senior engineering instructor. Explain the topic: "{topic}".
+
+Requirements (B.Tech level, production-ready clarity):
+- Audience: engineering students.
+- Tone: professional, precise, and concise.
+- Structure with short sections: definition, core concepts, math/notation (if relevant),
+  typical workflow/architecture, constraints/performance trade-offs, common pitfalls,
+  and 2 practical engineering examples.
+- Add 3–5 key takeaways as bullet points.
+- Keep it focused (~200–350 words).
+""",
+)
+
+API_RETEACH = PromptTemplate(
+    "api_reteach",
+    """
+Re-teach the topic "{topic}" in a VERY SIMPLE way (Feynman style) without losing technical correctness.
+
+Rules:
+- Start with a 1–2 line intuition.
+- Then explain the core idea in 5–10 bullet points.
+- Include 2 engineering/CS examples.
+- End with 3 short self-check questions.
+""",
+)
+
+API_QUIZ = PromptTemplate(
+    "api_quiz",
+    """
+You MUST generate MCQs ONLY from the explanation text provided below. Do NOT use outside facts.
+
+Topic: "{topic}"
+
+Explanation text (the ONLY source):
+<BEGIN_EXPLANATION>
+{explanation}
+<END_EXPLANATION>
+
+Task: Generate EXACTLY 10 multiple-choice questions (MCQs) derived ONLY from the explanation text.
+
+Rules:
+- Exactly 10 questions.
+- Each question MUST have exactly 4 options.
+- Only ONE option is correct.
+- Keep questions medium difficulty (engineering undergrad).
+- Avoid ambiguous wording.
+- Do not ask anything not explicitly stated or clearly implied in the explanation.
+
+Return STRICT JSON ONLY (no markdown, no extra text) in this schema:
+{{
+  "questions": [
+    {{
+      "question": "string",
+      "options": ["string", "string", "string", "string"],
+      "answer_index": 0
+    }}
+  ]
+}}
+""",
+)
+
+API_RELEVANCE = PromptTemplate(
+    "api_relevance",
+    """
+Evaluate how well these MCQs are grounded ONLY in the provided explanation.
+Return one integer 0-100 representing the percentage of questions that can be
+answered directly from the explanation text.
+
+Explanation:
+<BEGIN_EXPLANATION>
+{explanation}
+<END_EXPLANATION>
+
+MCQs:
+{mcqs}
+
+Return only the integer percentage (no words).
+""",
+)
+
+
+# =============================
+# Streamlit/CLI app (context_manager.py); content packs are built with these
+# =============================
+EXPLAIN = PromptTemplate(
+    "explain",
+    """
+You are a senior engineering instructor. Explain the topic: "{topic}".
+
+Requirements (B.Tech level, production-ready clarity):
+- Audience: B.Tech / technical degree students.
+- Tone: professional, precise, and concise (avoid school-level simplification).
+- Structure with short sections: definition, core concepts, math/notation (if relevant),
+  typical workflow/architecture or pipeline, constraints/performance trade-offs,
+  common misconceptions/pitfalls, and 2 practical engineering/CS examples.
+- Add 3–5 key takeaways as bullet points the learner must retain.
+- Keep it presentation-friendly and focused (about 200–350 words).
+""",
+)
+
+RETEACH = PromptTemplate(
+    "reteach",
+    """
+Re-teach the topic "{topic}" in a VERY SIMPLE way (Feynman style) without losing technical correctness.
+
+Rules:
+- Use short sentences and simple words.
+- Start with a 1–2 line intuition.
+- Then explain the core idea in 5–10 bullet points.
+- Include 2 engineering/CS examples (e.g., networking, OS, databases, software architecture).
+- End with 3 short self-check questions the student should be able to answer.
+""",
+)
+
+QUIZ = PromptTemplate(
+    "quiz",
+    """
+You MUST generate MCQs ONLY from the explanation text provided below. Do NOT use outside facts.
+
+Topic: "{topic}"
+
+Explanation text (the ONLY source):
+\"\"\"{explanation}\"\"\"
+
+Task: Generate EXACTLY 10 multiple-choice questions (MCQs) derived ONLY from the explanation text.
+
+Rules:
+- Exactly 10 questions.
+- Each question MUST have exactly 4 options.
+- Only ONE option is correct.
+- {difficulty_line}
+- Avoid ambiguous wording.
+- Do not ask anything that is not explicitly stated or clearly implied in the explanation text.
+- Keep terminology consistent with the explanation to maximize relevance/traceability.
+
+Return STRICT JSON ONLY (no markdown, no extra text) in this schema:
+{{
+  "mcqs": [
+    {{
+      "question": "string",
+      "options": ["string", "string", "string", "string"],
+      "answer_index": 0,
+      "explanation": "string"
+    }}
+  ]
+}}
+""",
+)
+
+QUIZ_DIFFICULTY = {
+    "normal": "Keep questions medium difficulty (B.Tech level).",
+    "easy": "Keep questions EASY and direct (based only on the explanation).",
+}
+
+RELEVANCE = PromptTemplate(
+    "relevance",
+    """
+Evaluate how well these MCQs are grounded ONLY in the provided explanation.
+Return one integer 0-100 representing the percentage of questions that can be
+answered directly from the explanation text.
+
+Explanation:
+\"\"\"{explanation}\"\"\"
+
+MCQs:
+{mcqs}
+
+Return only the integer percentage (no words).
+""",
+)
+
+# Templates whose output is stored in content packs (relevance scores are not).
+PACK_TEMPLATES = (EXPLAIN, RETEACH, QUIZ)
+
+
+def versions(templates: Iterable[PromptTemplate] = PACK_TEMPLATES) -> Dict[str, str]:
+    return {t.name: t.version for t in templates}
+
+
+def prompt_set_version(templates: Iterable[PromptTemplate] = PACK_TEMPLATES) -> str:
+    """One version for a set of templates (used as the content-pack key prefix)."""
+    joined = ",".join(f"{t.name}={t.version}" for t in templates)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()[:10]
@@ -0,0 +1,130 @@
+"""
+JSON responses for the API.
+
+- APIJSONResponse: the app's default response class, rendered with orjson;
+  ObjectId and datetime values (e.g. raw MongoDB documents) serialize natively.
+- Pre-encoded bodies for cached learning content: a cached explanation,
+  reteach text or quiz is validated against its response model and encoded
+  once (plus gzip/brotli copies for larger bodies). Every later hit sends
+  those bytes through a raw Response with a strong ETag, skipping pydantic
+  validation and JSON serialization on the request path.
+"""
+
+import gzip
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+# Bodies shorter than this are sent uncompressed (gzip overhead is not worth it).
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+# Pre-encoded bodies are compressed once and reused, so they get a higher level than on-the-fly responses.
+BROTLI_QUALITY = 9
+CONTENT_CODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class APIJSONResponse(JSONResponse):
+    """orjson-rendered JSONResponse; return it directly to also skip FastAPI's jsonable_encoder pass."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def accepted_coding(accept_encoding: str) -> Optional[str]:
+    """Preferred content coding we can produce for an Accept-Encoding header (q-values > 0 only)."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    for coding in CONTENT_CODINGS:
+        if coding in accepted or "*" in accepted:
+            return coding
+    return None
+
+
+def compress(body: bytes, coding: str, level: Optional[int] = None) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY if level is None else level)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL if level is None else level, mtime=0)
+
+
+def variant_etag(etag: str, coding: str) -> str:
+    # a differently encoded representation needs its own strong validator
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{coding}"'
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    body: bytes
+    etag: str
+    # content coding -> compressed body (empty for bodies under GZIP_MIN_BYTES)
+    compressed: Dict[str, bytes] = field(default_factory=dict)
+
+    def coding_for(self, request: Request) -> Optional[str]:
+        if not self.compressed:
+            return None
+        coding = accepted_coding(request.headers.get("accept-encoding", ""))
+        return coding if coding in self.compressed else None
+
+
+def encode_model(model: BaseModel) -> EncodedBody:
+    body = model.model_dump_json().encode("utf-8")
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    compressed = {c: compress(body, c) for c in CONTENT_CODINGS} if len(body) >= GZIP_MIN_BYTES else {}
+    return EncodedBody(body, etag, compressed)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags or any(variant_etag(etag, c) in tags for c in ("gzip", "br"))
+
+
+def encoded_response(request: Request, encoded: EncodedBody, headers: Optional[dict] = None) -> Response:
+    """Send `encoded` as JSON, compressed when accepted; GET/HEAD revalidations get a 304."""
+    headers = dict(headers or {})
+    if encoded.compressed:
+        headers["Vary"] = "Accept-Encoding"
+    coding = encoded.coding_for(request)
+    headers["ETag"] = variant_etag(encoded.etag, coding) if coding else encoded.etag
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and request.method in ("GET", "HEAD") and _etag_matches(if_none_match, encoded.etag):
+        return Response(status_code=304, headers=headers)
+
+    if coding:
+        # CompressionMiddleware leaves responses that already carry a Content-Encoding alone
+        headers["Content-Encoding"] = coding
+        return Response(encoded.compressed[coding], media_type="application/json", headers=headers)
+    return Response(encoded.body, media_type="application/json", headers=headers)
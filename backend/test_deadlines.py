@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+os.environ["GROQ_API_KEY"] = ""
+os.environ["WARM_UP_ON_STARTUP"] = "0"
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# flat imports as in main.py; the project root has its own main.py and context_manager.py
+sys.path.insert(0, os.path.join(BACKEND_DIR, "..", "benchmarks"))
+sys.path.insert(0, BACKEND_DIR)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from fakes import FakeLLM, InMemoryDatabase  # noqa: E402
+
+import database  # noqa: E402
+
+database.database = InMemoryDatabase()
+
+import main  # noqa: E402
+from context_manager import ContextManager  # noqa: E402
+
+BUDGET = 0.5
+LLM_LATENCY = 2.0
+CONCURRENT = 4
+# request handling, auth and response encoding on top of the budget
+SLACK = 0.5
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        client.post("/register", json={"email": "deadline@example.com", "password": "secret123"})
+        token = client.post("/token", data={"username": "deadline@example.com", "password": "secret123"})
+        client.headers["Authorization"] = f"Bearer {token.json()['access_token']}"
+        yield client
+
+
+@pytest.fixture
+def slow_llm(monkeypatch):
+    cm = ContextManager()
+    cm._llm = FakeLLM(latency=LLM_LATENCY)
+    monkeypatch.setattr(main, "context_manager", cm)
+    for operation in main.BUDGETS:
+        monkeypatch.setitem(main.BUDGETS, operation, BUDGET)
+
+
+@pytest.mark.parametrize(
+    "method,path,body",
+    [
+        ("POST", "/explain", lambda topic: {"json": {"topic": topic}}),
+        ("GET", "/explain", lambda topic: {"params": {"topic": topic}}),
+        ("POST", "/generate-quiz", lambda topic: {"json": {"topic": topic}}),
+        ("POST", "/reteach", lambda topic: {"json": {"topic": topic}}),
+    ],
+)
+def test_concurrent_requests_each_finish_within_budget(client, slow_llm, method, path, body):
+    def timed(i):
+        start = time.perf_counter()
+        response = client.request(method, path, **body(f"Deadline Topic {path} {i}"))
+        return response.status_code, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=CONCURRENT) as pool:
+        results = list(pool.map(timed, range(CONCURRENT)))
+
+    assert [status for status, _ in results] == [200] * CONCURRENT
+    # a handler blocking the event loop would serialize these: +1, +2, ... budgets
+    assert max(elapsed for _, elapsed in results) < BUDGET + SLACK
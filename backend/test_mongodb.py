@@ -2,7 +2,7 @@ import asyncio
 import sys
 import os
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
+from database import create_client
 
 load_dotenv()
 
@@ -12,7 +12,7 @@ async def test_mongodb():
         print(f"📡 Testing connection to: {mongodb_url[:50]}...")
         
         # Try to connect
-        client = AsyncIOMotorClient(mongodb_url, serverSelectionTimeoutMS=5000)
+        client = create_client(mongodb_url, minPoolSize=0, serverSelectionTimeoutMS=5000)
         
         # Test the connection
         await client.admin.command('ping')
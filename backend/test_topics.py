@@ -0,0 +1,60 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from context_manager import CacheEntry, ContextManager  # noqa: E402
+from topics import TopicIndex, canonical_topic  # noqa: E402
+
+
+def _index(*topics):
+    index = TopicIndex()
+    for topic in topics:
+        index.add(canonical_topic(topic))
+    return index
+
+
+def test_aliases_and_scaffolding_share_a_key():
+    assert canonical_topic("ML") == canonical_topic("What is Machine Learning?") == "machine learning"
+
+
+def test_typo_matches_known_topic():
+    index = _index("Natural Language Processing")
+    assert index.match(canonical_topic("natural language procesing")) == "natural language processing"
+
+
+def test_numbered_parts_are_not_merged():
+    # 3-gram Jaccard of these pairs is above 0.9
+    index = _index("Convolutional Neural Networks for Image Classification Part 1")
+    assert index.match(canonical_topic("Convolutional Neural Networks for Image Classification Part 2")) is None
+    assert index.match(canonical_topic("Convolutional Neural Networks for Image Classification Part II")) is None
+    assert index.match(canonical_topic("Convolutional Neural Network for Image Classification Part 1")) is not None
+
+
+def test_memoized_miss_is_dropped_when_a_topic_is_added():
+    index = _index("Deep Learning")
+    assert index.match("natural language procesing") is None
+    index.add("natural language processing")
+    assert index.match("natural language procesing") == "natural language processing"
+
+
+def test_prefixed_and_negated_topics_are_not_merged():
+    # 3-gram Jaccard of the first two pairs is above the 0.85 threshold
+    pairs = [
+        ("Symmetric Encryption", "Asymmetric Encryption"),
+        ("Synchronous Programming", "Asynchronous Programming"),
+        ("Supervised Learning", "Unsupervised Learning"),
+        ("Linear Regression", "Nonlinear Regression"),
+        ("Coding Theory", "Decoding Theory"),
+    ]
+    for known, other in pairs:
+        assert _index(known).match(canonical_topic(other)) is None
+        assert _index(other).match(canonical_topic(known)) is None
+
+
+def test_cache_key_does_not_reuse_the_opposite_topic():
+    cm = ContextManager()
+    cm._explanations["symmetric encryption"] = CacheEntry("Symmetric text", "llm")
+    cm._topic_index.add("symmetric encryption")
+    assert cm._cache_key(cm._explanations, "Asymmetric Encryption") == ("asymmetric encryption", False)
+    assert cm._cache_key(cm._explanations, "symetric encryption") == ("symmetric encryption", True)
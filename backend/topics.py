@@ -0,0 +1,227 @@
+"""
+Topic canonicalization and near-duplicate matching for content cache keys.
+
+canonical_topic() folds case, whitespace, punctuation and plural endings,
+strips question scaffolding ("What is ...?", "Explain ...") and maps common aliases, so
+"Machine Learning", "machine learning ", "What is Machine Learning?" and "ML"
+share one key. TopicIndex is a MinHash/LSH index over character n-grams of
+canonical topics that maps a new topic onto a known one (e.g. the typo
+"natural language procesing") when their n-gram Jaccard similarity clears a
+threshold and they differ only by a typo-sized edit inside one word: the
+same number of words, one word changed by at most one or two edits, its
+first two letters unchanged. Prefixes and negations ("symmetric" vs
+"asymmetric", "supervised" vs "unsupervised") and numbers ("... part 1" vs
+"... part 2") are never merged. Match results are memoized until the index
+changes.
+
+Standard library only, so the Streamlit app can import it as `backend.topics`.
+"""
+
+import hashlib
+import random
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+_SCAFFOLDING = re.compile(
+    r"^(?:(?:what|who)\s+(?:is|are)|explain|define|describe|tell\s+me\s+about|teach\s+me|"
+    r"introduction\s+to|intro\s+to|basics\s+of|an?\s+overview\s+of|overview\s+of)\s+"
+)
+_ARTICLE = re.compile(r"^(?:a|an|the)\s+")
+
+ALIASES: Dict[str, str] = {
+    "ai": "artificial intelligence",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nn": "neural network",
+    "nns": "neural network",
+    "ann": "neural network",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "rl": "reinforcement learning",
+    "genai": "generative ai",
+    "gen ai": "generative ai",
+    "llm": "large language model",
+    "dsa": "data structure and algorithm",
+    "data structure & algorithm": "data structure and algorithm",
+}
+
+
+def _singular(word: str) -> str:
+    # deliberately crude: only has to be consistent, not linguistically right
+    if len(word) > 3 and word.isalpha() and word.endswith("s") and not word.endswith(("ss", "is", "us", "as")):
+        return word[:-1]
+    return word
+
+
+def canonical_topic(topic: str) -> str:
+    """Canonical cache key for a free-form topic string."""
+    text = (topic or "").casefold().replace("&", " & ")
+    text = re.sub(r"[^\w\s&+#.]|_", " ", text)
+    text = re.sub(r"\s+", " ", text).strip(" .")
+    text = _SCAFFOLDING.sub("", text)
+    text = _ARTICLE.sub("", text)
+    text = " ".join(_singular(word) for word in text.split()).strip(" .")
+    return ALIASES.get(text, text)
+
+
+# =============================
+# MinHash / LSH
+# =============================
+_MERSENNE = (1 << 61) - 1
+
+
+def _shingles(text: str, n: int) -> Set[str]:
+    padded = f" {text} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i : i + n] for i in range(len(padded) - n + 1)}
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+# tokens that tell otherwise near-identical topics apart: "part 1"/"part 2", "level ii", "type a"
+_MARKER = re.compile(r"\b(?:\d+|[ivx]+|[a-z])\b")
+
+
+def _markers(topic: str) -> List[str]:
+    return _MARKER.findall(topic)
+
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance with adjacent transpositions (optimal string alignment)."""
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def is_typo_variant(a: str, b: str) -> bool:
+    """Whether canonical topics `a` and `b` differ only by a misspelling inside one word."""
+    words_a, words_b = a.split(), b.split()
+    if len(words_a) != len(words_b) or _markers(a) != _markers(b):
+        return False
+    changed = [(x, y) for x, y in zip(words_a, words_b) if x != y]
+    if len(changed) != 1:
+        return False
+    x, y = changed[0]
+    shorter = min(len(x), len(y))
+    # short words differ by meaning ("tree"/"trie"); a changed start is a prefix or negation ("a-", "un-", "non-")
+    if shorter < 5 or x[:2] != y[:2]:
+        return False
+    return _edit_distance(x, y) <= (1 if shorter < 8 else 2)
+
+
+class TopicIndex:
+    """
+    LSH index (bands x rows MinHash) over canonical topics.
+
+    Candidates sharing any band bucket are verified with the exact n-gram
+    Jaccard similarity, so the threshold is not blurred by estimation error,
+    and must be a typo variant of the topic (is_typo_variant).
+    Results are memoized (up to `memo_size` topics, 0 = off) until a topic is added or removed.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        ngram: int = 3,
+        bands: int = 16,
+        rows: int = 4,
+        seed: int = 1,
+        memo_size: int = 4096,
+    ):
+        self.threshold = threshold
+        self.ngram = ngram
+        self.bands = bands
+        self.rows = rows
+        self.memo_size = memo_size
+        rng = random.Random(seed)
+        self._perms: List[Tuple[int, int]] = [
+            (rng.randrange(1, _MERSENNE), rng.randrange(0, _MERSENNE)) for _ in range(bands * rows)
+        ]
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [{} for _ in range(bands)]
+        self._shingles: Dict[str, Set[str]] = {}
+        self._matches: Dict[str, Optional[str]] = {}
+        # bumped whenever the indexed topics change; a match computed against an older set is not memoized
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def __contains__(self, topic: object) -> bool:
+        return topic in self._shingles
+
+    def _signature(self, shingles: Set[str]) -> List[int]:
+        hashes = [_shingle_hash(s) for s in shingles]
+        return [min((a * h + b) % _MERSENNE for h in hashes) for a, b in self._perms]
+
+    def _band_keys(self, signature: List[int]) -> List[Tuple[int, ...]]:
+        return [tuple(signature[i * self.rows : (i + 1) * self.rows]) for i in range(self.bands)]
+
+    def add(self, topic: str) -> None:
+        if topic in self._shingles:
+            return
+        shingles = _shingles(topic, self.ngram)
+        keys = self._band_keys(self._signature(shingles))
+        with self._lock:
+            self._shingles[topic] = shingles
+            for band, key in zip(self._buckets, keys):
+                band.setdefault(key, set()).add(topic)
+            self._invalidate()
+
+    def discard(self, topic: str) -> None:
+        with self._lock:
+            shingles = self._shingles.pop(topic, None)
+            if shingles is None:
+                return
+            for band in self._buckets:
+                for key in [k for k, members in band.items() if topic in members]:
+                    band[key].discard(topic)
+                    if not band[key]:
+                        del band[key]
+            self._invalidate()
+
+    def _invalidate(self) -> None:
+        # called with self._lock held
+        self._matches.clear()
+        self._generation += 1
+
+    def match(self, topic: str) -> Optional[str]:
+        """Most similar indexed typo variant with Jaccard >= threshold (the topic itself if indexed)."""
+        if topic in self._shingles:
+            return topic
+        with self._lock:
+            if topic in self._matches:
+                return self._matches[topic]
+            generation = self._generation
+        shingles = _shingles(topic, self.ngram)
+        keys = self._band_keys(self._signature(shingles))
+        with self._lock:
+            candidates = set()
+            for band, key in zip(self._buckets, keys):
+                candidates |= band.get(key, set())
+            scored = [(jaccard(shingles, self._shingles[c]), c) for c in candidates]
+        scored = [(score, c) for score, c in scored if score >= self.threshold and is_typo_variant(topic, c)]
+        best = max(scored, default=None)
+        match = best[1] if best is not None else None
+        with self._lock:
+            if generation == self._generation and self.memo_size:
+                if len(self._matches) >= self.memo_size:
+                    self._matches.clear()
+                self._matches[topic] = match
+        return match
@@ -0,0 +1,162 @@
+"""
+Lightweight per-request span tracing.
+
+TracingMiddleware opens a trace for every HTTP request; code on the request
+path wraps interesting steps in `span("name")`. When the response starts the
+collected spans are sent back as a `Server-Timing` header, and, if
+TRACE_EXPORT_PATH is set, the full trace is appended to that file as one
+JSON line (only for requests slower than TRACE_SLOW_MS, default 0 = all).
+The file is written by a background thread, never on the event loop.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "0"))
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    duration: float
+    parent: Optional[str] = None
+
+
+@dataclass
+class Trace:
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    start: float = field(default_factory=time.perf_counter)
+    started_at: float = field(default_factory=time.time)
+    spans: List[Span] = field(default_factory=list)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def server_timing(self) -> str:
+        entries = [f"{s.name};dur={s.duration * 1000:.1f}" for s in self.spans]
+        entries.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(entries)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[str]] = ContextVar("current_span", default=None)
+# JSON lines waiting for the writer thread (started on the first export)
+_export_queue: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as a span of the current request (no-op outside a request)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    parent = _current_span.get()
+    token = _current_span.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+        trace.spans.append(Span(name=name, start=start, duration=time.perf_counter() - start, parent=parent))
+
+
+def _export(trace: Trace, scope, status_code: int) -> None:
+    duration_ms = trace.elapsed_ms()
+    if duration_ms < TRACE_SLOW_MS:
+        return
+    route = scope.get("route")
+    record = {
+        "trace_id": trace.trace_id,
+        "started_at": trace.started_at,
+        "method": scope.get("method"),
+        "path": scope.get("path"),
+        "route": getattr(route, "path", None),
+        "status": status_code,
+        "duration_ms": round(duration_ms, 3),
+        "spans": [
+            {
+                "name": s.name,
+                "parent": s.parent,
+                "offset_ms": round((s.start - trace.start) * 1000, 3),
+                "duration_ms": round(s.duration * 1000, 3),
+            }
+            for s in trace.spans
+        ],
+    }
+    _export_queue.put(json.dumps(record) + "\n")
+    _ensure_writer()
+
+
+def _ensure_writer() -> None:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_write_traces, name="trace-export", daemon=True)
+                _writer.start()
+
+
+def _write_traces() -> None:
+    """Append queued trace lines to TRACE_EXPORT_PATH, batching whatever piled up since the last write."""
+    while True:
+        lines = [_export_queue.get()]
+        while True:
+            try:
+                lines.append(_export_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            with open(TRACE_EXPORT_PATH, "a", encoding="utf-8") as fh:
+                fh.writelines(lines)
+        except OSError as exc:
+            print(f"Warning: trace export to {TRACE_EXPORT_PATH} failed: {exc}")
+
+
+class TracingMiddleware:
+    """ASGI middleware that collects spans per request and emits a Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        token = _current_trace.set(trace)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            if TRACE_EXPORT_PATH:
+                _export(trace, scope, status_code)
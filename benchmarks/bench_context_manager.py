@@ -0,0 +1,139 @@
+"""
+Micro-benchmarks for the CPU-side hot paths of both context managers.
+
+Covers JSON extraction/parsing of realistic and noisy completions, MCQ
+cleaning, fallback MCQs, tokenization, lexical relevance scoring, the
+/evaluate scoring helper and cache-hit response building (pydantic model vs
+pre-encoded bytes). The LLM is never called.
+
+Usage:
+    python benchmarks/bench_context_manager.py                 # compare against the stored baseline
+    python benchmarks/bench_context_manager.py --save-baseline # refresh benchmarks/baselines/context_manager.json
+"""
+
+import importlib.util
+import json
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BENCH_DIR, ".."))
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+
+# Keep both context managers offline (an empty key wins over any .env file).
+os.environ["GROQ_API_KEY"] = ""
+sys.path.insert(0, BACKEND_DIR)
+# after backend/, so flat `context_manager`/`main` stay the backend modules; the root one imports `backend.*`
+sys.path.append(ROOT_DIR)
+
+from harness import BenchmarkSuite, main  # noqa: E402
+
+import context_manager as backend_cm  # noqa: E402
+from main import GenerateQuizResponse, score_answers  # noqa: E402
+from responses import encode_model, encoded_response  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from topics import TopicIndex, canonical_topic  # noqa: E402
+
+
+def _load_root_context_manager():
+    spec = importlib.util.spec_from_file_location("root_context_manager", os.path.join(ROOT_DIR, "context_manager.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+root_cm = _load_root_context_manager()
+
+
+# =============================
+# Fixtures
+# =============================
+EXPLANATION = (
+    "## Machine Learning\n\n"
+    "**Definition**\n- Machine learning builds models that learn patterns from training data "
+    "to make predictions on unseen inputs.\n\n"
+    "**Core Concepts**\n- Features, labels, loss functions, gradient descent, generalization, "
+    "overfitting and regularization.\n- Supervised, unsupervised and reinforcement learning paradigms.\n\n"
+    "**Workflow**\n- Collect data, engineer features, train, validate with held-out data, deploy, monitor drift.\n\n"
+    "**Trade-offs**\n- Bias versus variance, model capacity versus latency, accuracy versus interpretability.\n\n"
+    "**Examples**\n- Spam filtering with logistic regression.\n- Recommendation systems using matrix factorization.\n"
+) * 2
+
+QUESTIONS = [
+    {
+        "question": f"Which technique reduces overfitting when training machine learning models? ({i + 1})",
+        "options": [
+            "Regularization of model parameters",
+            "Training longer on the same data",
+            "Removing the validation split",
+            "Increasing model capacity without limits",
+        ],
+        "answer_index": 0,
+        "explanation": "Regularization penalizes complexity and improves generalization.",
+    }
+    for i in range(10)
+]
+
+CLEAN_COMPLETION = json.dumps({"questions": QUESTIONS, "mcqs": QUESTIONS})
+FENCED_COMPLETION = (
+    "Sure! Here are the 10 MCQs you asked for, derived strictly from the explanation:\n\n```json\n"
+    + json.dumps({"questions": QUESTIONS, "mcqs": QUESTIONS}, indent=2)
+    + "\n```\n\nLet me know if you need them at a different difficulty."
+)
+NOISY_COMPLETION = (
+    "I considered the {topic} placeholder and the [BEGIN] marker first. " * 40
+    + "Final answer follows without a closing brace: {\"questions\": ["
+    + json.dumps(QUESTIONS[0])
+)
+MALFORMED_QUESTIONS = QUESTIONS[:6] + [
+    {"question": "", "options": ["a", "b", "c", "d"], "answer_index": 0},
+    {"question": "Three options only", "options": ["a", "b", "c"], "answer_index": 1},
+    {"question": "Bad index", "options": ["a", "b", "c", "d"], "answer_index": "x"},
+    "not a dict",
+]
+ANSWERS = [0, 1, 2, 3, 0, 1, 2, 3, 0, 1]
+CORRECT = [0, 1, 2, 3, 0, 0, 0, 0, 0, 0]
+
+suite = BenchmarkSuite("context_manager", os.path.join(BENCH_DIR, "baselines", "context_manager.json"))
+
+for label, cm in (("backend", backend_cm), ("root", root_cm)):
+    for kind, completion in (("clean", CLEAN_COMPLETION), ("fenced", FENCED_COMPLETION), ("noisy", NOISY_COMPLETION)):
+        suite.add(
+            f"{label}.extract_and_load[{kind}]",
+            lambda cm=cm, completion=completion: cm._safe_json_load(cm._extract_json_object(completion)),
+        )
+    suite.add(f"{label}.clean_mcqs[valid]", lambda cm=cm: cm._clean_mcqs(QUESTIONS))
+    suite.add(f"{label}.clean_mcqs[malformed]", lambda cm=cm: cm._clean_mcqs(MALFORMED_QUESTIONS))
+    suite.add(f"{label}.tokenize", lambda cm=cm: cm._tokenize(EXPLANATION))
+    suite.add(f"{label}.lexical_relevance", lambda cm=cm: cm._lexical_relevance_score(EXPLANATION, QUESTIONS))
+
+_offline_backend = backend_cm.ContextManager()
+_offline_backend._llm = None
+suite.add("backend.fallback_mcqs", lambda: _offline_backend._fallback_mcqs("Machine Learning", EXPLANATION))
+suite.add(
+    "backend.compute_relevance_score[offline]",
+    lambda: _offline_backend.compute_relevance_score(EXPLANATION, QUESTIONS),
+)
+suite.add("root.fallback_mcqs", lambda: root_cm._fallback_mcqs("Machine Learning", EXPLANATION))
+suite.add("root.compute_relevance_score[offline]", lambda: root_cm.compute_relevance_score(EXPLANATION, QUESTIONS))
+suite.add("backend.evaluate.score_answers", lambda: score_answers(ANSWERS, CORRECT))
+
+# memo off: every round pays for the MinHash signature, the LSH lookup and candidate verification
+_topic_index = TopicIndex(memo_size=0)
+for _topic in ("machine learning", "deep learning", "natural language processing", "computer vision"):
+    _topic_index.add(_topic)
+suite.add("backend.canonical_topic", lambda: canonical_topic("What is Natural Language Processing?"))
+suite.add("backend.topic_index.match[cold]", lambda: _topic_index.match("natural language procesing"))
+
+_QUIZ_QUESTIONS = backend_cm._clean_mcqs(QUESTIONS)
+_QUIZ_BODY = encode_model(GenerateQuizResponse(questions=_QUIZ_QUESTIONS, relevance_score=100))
+_REQUEST = Request({"type": "http", "method": "POST", "headers": [(b"accept-encoding", b"gzip, br")]})
+suite.add(
+    "backend.quiz_response[model]",
+    lambda: GenerateQuizResponse(questions=_QUIZ_QUESTIONS, relevance_score=100).model_dump_json().encode(),
+)
+suite.add("backend.quiz_response[encoded]", lambda: encoded_response(_REQUEST, _QUIZ_BODY))
+
+
+if __name__ == "__main__":
+    sys.exit(main(suite))
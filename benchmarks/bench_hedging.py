@@ -0,0 +1,124 @@
+"""
+Tail latency of LLM calls with and without hedging.
+
+Drives ContextManager._invoke() (circuit breaker + hedging policy) from a few
+threads against FakeLLM with a long-tail latency profile: most calls take
+`--latency` (+ jitter), a `--tail-rate` share takes `--tail-latency`. The
+same calls run once with hedging off and once with it on, and the script
+prints p50/p90/p99/max per operation plus the hedge rate (hedged calls / all
+calls) and win rate (hedges that finished first / hedged calls).
+
+The first `--warmup` calls per operation only fill the rolling latency
+window the hedge delay is taken from and are not reported. The LLM is never
+called.
+
+Usage:
+    python benchmarks/bench_hedging.py
+    python benchmarks/bench_hedging.py --calls 500 --tail-rate 0.05 --tail-latency 2 --budget 0.1
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(BENCH_DIR, "..", "backend"))
+
+os.environ["GROQ_API_KEY"] = ""
+sys.path.insert(0, BACKEND_DIR)
+
+from fakes import FakeLLM  # noqa: E402
+from loadtest import percentile  # noqa: E402
+
+import context_manager as backend_cm  # noqa: E402
+from hedging import HedgePolicy  # noqa: E402
+from metrics import LLM_HEDGE_CALLS, LLM_HEDGE_WINS  # noqa: E402
+from prompts import API_EXPLAIN, API_QUIZ  # noqa: E402
+
+PROMPTS = {
+    "explain": API_EXPLAIN.render(topic="Machine Learning"),
+    "quiz": API_QUIZ.render(topic="Machine Learning", explanation="Machine learning fits models to data."),
+}
+
+
+def run(args: argparse.Namespace, hedged: bool) -> Dict[str, Dict[str, float]]:
+    cm = backend_cm.ContextManager()
+    cm._llm = FakeLLM(
+        latency=args.latency,
+        jitter=args.jitter,
+        seed=args.seed,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+    )
+    cm._hedger = HedgePolicy(enabled=hedged, quantile=args.quantile, min_samples=args.warmup, budget=args.budget)
+
+    report: Dict[str, Dict[str, float]] = {}
+    for operation, prompt in PROMPTS.items():
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(lambda _: cm._invoke(operation, prompt), range(args.warmup)))
+        hedged_before = LLM_HEDGE_CALLS.value(operation=operation, outcome="hedged")
+        wins_before = LLM_HEDGE_WINS.value(operation=operation, winner="hedge")
+
+        def timed(_: int) -> float:
+            start = time.perf_counter()
+            cm._invoke(operation, prompt)
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            latencies: List[float] = sorted(pool.map(timed, range(args.calls)))
+
+        hedges = LLM_HEDGE_CALLS.value(operation=operation, outcome="hedged") - hedged_before
+        wins = LLM_HEDGE_WINS.value(operation=operation, winner="hedge") - wins_before
+        report[operation] = {
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p90_ms": round(percentile(latencies, 90) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1),
+            "hedge_rate": round(hedges / args.calls, 3),
+            "win_rate": round(wins / hedges, 3) if hedges else 0.0,
+        }
+    return report
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=300, help="measured calls per operation")
+    parser.add_argument("--warmup", type=int, default=50, help="calls per operation before measuring")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="usual fake LLM latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra uniform random latency (s)")
+    parser.add_argument("--tail-rate", type=float, default=0.05, help="share of slow calls")
+    parser.add_argument("--tail-latency", type=float, default=1.0, help="latency of slow calls (s)")
+    parser.add_argument("--quantile", type=float, default=0.9, help="hedge after this latency quantile")
+    parser.add_argument("--budget", type=float, default=0.1, help="extra requests allowed per call")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    results = {"off": run(args, hedged=False), "on": run(args, hedged=True)}
+    print(
+        f"{'operation':<10} {'hedging':<8} {'p50_ms':>8} {'p90_ms':>8} {'p99_ms':>8} {'max_ms':>8} "
+        f"{'hedge_rate':>11} {'win_rate':>9}"
+    )
+    for operation in PROMPTS:
+        for mode, report in results.items():
+            r = report[operation]
+            print(
+                f"{operation:<10} {mode:<8} {r['p50_ms']:>8} {r['p90_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8} "
+                f"{r['hedge_rate']:>11} {r['win_rate']:>9}"
+            )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"config": vars(args), "results": results}, fh, indent=2)
+            fh.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Import-time benchmark for the backend cold start.
+
+Runs `python -X importtime -c "import main"` in backend/ in fresh processes,
+reports the total import time of the app and the heaviest direct imports
+of each first-party module, and compares the totals against
+benchmarks/baselines/import_time.json like the other suites.
+
+Usage:
+    python benchmarks/bench_import.py              # compare against the stored baseline
+    python benchmarks/bench_import.py --save-baseline
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from harness import BenchmarkSuite, compare
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(BENCH_DIR, "..", "backend"))
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+FIRST_PARTY = (
+    "main",
+    "auth",
+    "circuit_breaker",
+    "compression",
+    "content_pack",
+    "context_manager",
+    "curriculum",
+    "database",
+    "deadline",
+    "hedging",
+    "llm",
+    "metrics",
+    "models",
+    "profiling",
+    "prompts",
+    "responses",
+    "topics",
+    "tracing",
+)
+
+
+def import_profile(module: str) -> List[Tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us, depth) rows for one fresh `import module`."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def direct_children(rows) -> Dict[str, List[Tuple[str, int]]]:
+    """Map each first-party module to the cumulative cost of the modules it imports directly."""
+    children: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+    pending: List[Tuple[str, int, int]] = []
+    # -X importtime prints children before their parent, one indent level deeper.
+    for name, _self_us, cumulative_us, depth in rows:
+        while pending and pending[-1][2] > depth:
+            child_name, child_cumulative, _ = pending.pop()
+            if name in FIRST_PARTY:
+                children[name].append((child_name, child_cumulative))
+        pending.append((name, cumulative_us, depth))
+    return children
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure backend import time with -X importtime")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreter runs")
+    parser.add_argument("--top", type=int, default=8, help="heaviest imports to show per module")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown vs baseline")
+    args = parser.parse_args(argv)
+
+    suite = BenchmarkSuite("import_time", os.path.join(BENCH_DIR, "baselines", "import_time.json"))
+    totals: Dict[str, List[int]] = defaultdict(list)
+    last_rows = []
+    for _ in range(args.runs):
+        last_rows = import_profile("main")
+        for name, _self_us, cumulative_us, depth in last_rows:
+            if name in FIRST_PARTY:
+                totals[name].append(cumulative_us)
+
+    results = {
+        f"import {name}": {
+            "min_us": min(values),
+            "median_us": statistics.median(values),
+            "mean_us": round(statistics.fmean(values), 1),
+            "rounds": len(values),
+        }
+        for name, values in sorted(totals.items())
+    }
+
+    baseline = suite.load_baseline()
+    print(f"{'module':<24} {'min_ms':>9} {'median_ms':>10} {'base_ms':>9}")
+    for name, r in results.items():
+        previous = baseline.get(name, {}).get("min_us")
+        base = f"{previous / 1000:.1f}" if previous else "-"
+        print(f"{name:<24} {r['min_us'] / 1000:>9.1f} {r['median_us'] / 1000:>10.1f} {base:>9}")
+
+    print("\nHeaviest direct imports (last run, cumulative ms):")
+    for parent, kids in sorted(direct_children(last_rows).items()):
+        heaviest = sorted(kids, key=lambda item: item[1], reverse=True)[: args.top]
+        print(f"  {parent}: " + ", ".join(f"{n} {us / 1000:.1f}" for n, us in heaviest))
+
+    if args.save_baseline:
+        suite.save_baseline(results)
+        print(f"\nBaseline saved to {suite.baseline_path}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressions above {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
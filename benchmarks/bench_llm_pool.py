@@ -0,0 +1,165 @@
+"""
+Per-call connection overhead of LLM requests, cold vs pooled.
+
+A local HTTPS stub (self-signed certificate, HTTP/1.1 keep-alive) answers
+Groq-style chat completion requests instantly, so the timings are pure
+client-side connection cost:
+
+- fresh_connection: a new httpx client per call, i.e. TCP connect + TLS
+  handshake every time. This is what every call paid before the shared pool
+  whenever calls were more than the SDK's 5 s keep-alive expiry apart.
+- pooled: the shared build_http_client() pool, reusing a kept-alive connection.
+- groq_sdk.*: the same two paths through the groq SDK client ChatGroq wraps.
+
+Real provider round trips add DNS and network RTTs to every handshake, so the
+gap in production is larger than measured here. The LLM is never called.
+
+Usage:
+    python benchmarks/bench_llm_pool.py                 # compare against the stored baseline
+    python benchmarks/bench_llm_pool.py --save-baseline # refresh benchmarks/baselines/llm_pool.json
+"""
+
+import datetime
+import json
+import os
+import ssl
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(BENCH_DIR, "..", "backend"))
+
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx  # noqa: E402
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+from groq import Groq  # noqa: E402
+
+from harness import BenchmarkSuite, main  # noqa: E402
+
+from llm import build_http_client  # noqa: E402
+
+COMPLETION = json.dumps(
+    {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "llama-3.1-8b-instant",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": "ok"},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+).encode("utf-8")
+REQUEST = {"model": "llama-3.1-8b-instant", "messages": [{"role": "user", "content": "ping"}]}
+
+
+# =============================
+# Local HTTPS stub
+# =============================
+def _self_signed_cert(directory: str) -> tuple:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as fh:
+        fh.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as fh:
+        fh.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_path, key_path
+
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # headers and body in one segment; split writes stall ~40 ms on Nagle + delayed ACK
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(COMPLETION)))
+        self.end_headers()
+        self.wfile.write(COMPLETION)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server() -> tuple:
+    """Serve HTTPS on a free localhost port; returns (base_url, ssl context trusting the stub's cert)."""
+    cert_dir = tempfile.mkdtemp(prefix="bench_llm_pool_")
+    cert_path, key_path = _self_signed_cert(cert_dir)
+    server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_context.load_cert_chain(cert_path, key_path)
+
+    server = ThreadingHTTPServer(("localhost", 0), _CompletionHandler)
+    server.daemon_threads = True
+    server.socket = server_context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"https://localhost:{server.server_address[1]}", ssl.create_default_context(cafile=cert_path)
+
+
+BASE_URL, CLIENT_CONTEXT = start_stub_server()
+CHAT_URL = f"{BASE_URL}/openai/v1/chat/completions"
+
+POOLED = build_http_client(verify=CLIENT_CONTEXT)
+POOLED_SDK = Groq(api_key="bench", base_url=BASE_URL, http_client=POOLED, max_retries=0)
+
+
+def _fresh_connection() -> bytes:
+    with httpx.Client(verify=CLIENT_CONTEXT) as client:
+        return client.post(CHAT_URL, json=REQUEST).content
+
+
+def _pooled() -> bytes:
+    return POOLED.post(CHAT_URL, json=REQUEST).content
+
+
+def _sdk_fresh_connection() -> object:
+    with httpx.Client(verify=CLIENT_CONTEXT) as http_client:
+        sdk = Groq(api_key="bench", base_url=BASE_URL, http_client=http_client, max_retries=0)
+        return sdk.chat.completions.create(**REQUEST)
+
+
+def _sdk_pooled() -> object:
+    return POOLED_SDK.chat.completions.create(**REQUEST)
+
+
+suite = BenchmarkSuite("llm_pool", os.path.join(BENCH_DIR, "baselines", "llm_pool.json"))
+suite.add("httpx.fresh_connection", _fresh_connection)
+suite.add("httpx.pooled", _pooled)
+suite.add("groq_sdk.fresh_connection", _sdk_fresh_connection)
+suite.add("groq_sdk.pooled", _sdk_pooled)
+
+
+if __name__ == "__main__":
+    sys.exit(main(suite))
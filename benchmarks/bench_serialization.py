@@ -0,0 +1,112 @@
+"""
+Serialization CPU and bytes on the wire per endpoint.
+
+For representative /explain, /reteach, /generate-quiz, /evaluate and /progress
+(100 MongoDB documents with ObjectId and datetime values) payloads it times:
+
+- stdlib: FastAPI's previous path (jsonable_encoder / model_dump + JSONResponse)
+- orjson: the APIJSONResponse default response class
+- gzip / br: on-the-fly compression as done by CompressionMiddleware
+
+and prints the body size raw, gzipped and brotli-compressed (brotli only when
+the `brotli` package is installed). The LLM is never called.
+
+Usage:
+    python benchmarks/bench_serialization.py                 # compare against the stored baseline
+    python benchmarks/bench_serialization.py --save-baseline # refresh benchmarks/baselines/serialization.json
+"""
+
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(BENCH_DIR, "..", "backend"))
+
+os.environ["GROQ_API_KEY"] = ""
+sys.path.insert(0, BACKEND_DIR)
+
+from bson import ObjectId  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from harness import BenchmarkSuite, main  # noqa: E402
+
+from compression import LEVELS  # noqa: E402
+from fakes import _fake_explanation, _fake_mcqs  # noqa: E402
+from main import EvaluateResponse, ExplainResponse, GenerateQuizResponse, ReteachResponse  # noqa: E402
+from responses import CONTENT_CODINGS, APIJSONResponse, compress  # noqa: E402
+
+# =============================
+# Payloads
+# =============================
+EXPLANATION = _fake_explanation('Explain the topic: "Machine Learning".') * 2
+QUESTIONS = [
+    {k: q[k] for k in ("question", "options", "answer_index")} for q in json.loads(_fake_mcqs())["questions"]
+]
+_NOW = datetime.now(timezone.utc)
+PROGRESS_DOCS = [
+    {
+        "_id": ObjectId(),
+        "user_id": str(ObjectId()),
+        "topic": f"Topic {i % 10}",
+        "attempt_number": i % 3 + 1,
+        "score": (i * 37) % 101,
+        "date": _NOW - timedelta(minutes=i),
+    }
+    for i in range(100)
+]
+
+MODELS = {
+    "explain": lambda: ExplainResponse(explanation=EXPLANATION),
+    "reteach": lambda: ReteachResponse(simplified_explanation=EXPLANATION[: len(EXPLANATION) // 2]),
+    "generate_quiz": lambda: GenerateQuizResponse(questions=QUESTIONS, relevance_score=100),
+    "evaluate": lambda: EvaluateResponse(
+        score=80, attempt_number=1, max_attempts_reached=False, next_topic="Deep Learning"
+    ),
+}
+
+
+def _progress_stdlib() -> bytes:
+    # the previous /progress body: stringify _id in a loop, then FastAPI's jsonable_encoder + json.dumps
+    records = [dict(d) for d in PROGRESS_DOCS]
+    for record in records:
+        record["_id"] = str(record["_id"])
+    return JSONResponse(jsonable_encoder({"progress": records})).body
+
+
+def _progress_orjson() -> bytes:
+    return APIJSONResponse({"progress": [dict(d) for d in PROGRESS_DOCS]}).body
+
+
+suite = BenchmarkSuite("serialization", os.path.join(BENCH_DIR, "baselines", "serialization.json"))
+
+BODIES = {}
+for _name, _build in MODELS.items():
+    suite.add(f"{_name}.stdlib", lambda b=_build: JSONResponse(b().model_dump(mode="json")).body)
+    suite.add(f"{_name}.orjson", lambda b=_build: APIJSONResponse(b().model_dump(mode="json")).body)
+    BODIES[_name] = APIJSONResponse(_build().model_dump(mode="json")).body
+suite.add("progress.stdlib", _progress_stdlib)
+suite.add("progress.orjson", _progress_orjson)
+BODIES["progress"] = _progress_orjson()
+
+for _name in ("generate_quiz", "progress"):
+    for _coding in CONTENT_CODINGS:
+        suite.add(
+            f"{_name}.{_coding}",
+            lambda body=BODIES[_name], coding=_coding: compress(body, coding, LEVELS[coding]),
+        )
+
+
+def print_wire_sizes() -> None:
+    print(f"{'endpoint':<16} {'raw_bytes':>10} " + " ".join(f"{c + '_bytes':>11}" for c in CONTENT_CODINGS))
+    for name, body in BODIES.items():
+        sizes = " ".join(f"{len(compress(body, c, LEVELS[c])):>11}" for c in CONTENT_CODINGS)
+        print(f"{name:<16} {len(body):>10} {sizes}")
+    print()
+
+
+if __name__ == "__main__":
+    print_wire_sizes()
+    sys.exit(main(suite))
@@ -0,0 +1,150 @@
+"""
+In-memory stand-ins used by the benchmark and load-test scripts.
+
+- InMemoryDatabase: the subset of the motor API that backend/main.py and
+  backend/auth.py use (find_one, insert_one, count_documents, find().sort().to_list()).
+- FakeLLM: a ChatGroq look-alike whose invoke() sleeps for a configurable
+  latency and returns well-formed explanations, MCQ JSON or relevance scores.
+"""
+
+import copy
+import json
+import random
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+
+# =============================
+# In-memory Mongo stand-in
+# =============================
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    return all(doc.get(key) == value for key, value in (query or {}).items())
+
+
+class InMemoryCursor:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self._docs = docs
+
+    def sort(self, key: str, direction: int = 1) -> "InMemoryCursor":
+        self._docs.sort(key=lambda d: d.get(key), reverse=direction < 0)
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        return [copy.deepcopy(d) for d in self._docs[:length]]
+
+
+class InMemoryCollection:
+    def __init__(self) -> None:
+        self._docs: List[Dict[str, Any]] = []
+
+    async def find_one(self, query: Optional[Dict[str, Any]] = None, sort=None) -> Optional[Dict[str, Any]]:
+        docs = [d for d in self._docs if _matches(d, query or {})]
+        for key, direction in reversed(sort or []):
+            docs.sort(key=lambda d: d.get(key), reverse=direction < 0)
+        return copy.deepcopy(docs[0]) if docs else None
+
+    async def insert_one(self, doc: Dict[str, Any]) -> SimpleNamespace:
+        doc.setdefault("_id", ObjectId())
+        self._docs.append(copy.deepcopy(doc))
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def count_documents(self, query: Dict[str, Any]) -> int:
+        return sum(1 for d in self._docs if _matches(d, query))
+
+    def find(self, query: Optional[Dict[str, Any]] = None) -> InMemoryCursor:
+        return InMemoryCursor([d for d in self._docs if _matches(d, query or {})])
+
+
+class InMemoryDatabase:
+    def __init__(self) -> None:
+        self._collections: Dict[str, InMemoryCollection] = {}
+
+    def __getattr__(self, name: str) -> InMemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._collections.setdefault(name, InMemoryCollection())
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        return getattr(self, name)
+
+
+# =============================
+# Fake LLM
+# =============================
+def _fake_explanation(prompt: str) -> str:
+    topic = prompt.split('"')[1] if prompt.count('"') >= 2 else "the topic"
+    paragraph = (
+        f"{topic} is an engineering concept built from well defined abstractions, inputs, "
+        "processing steps and measurable outputs. Engineers reason about constraints such as "
+        "latency, memory, accuracy and security when applying it in production systems. "
+    )
+    return f"## {topic}\n\n" + paragraph * 6 + "\n**Key Takeaways**\n- Definition\n- Workflow\n- Trade-offs\n"
+
+
+def _fake_mcqs() -> str:
+    questions = [
+        {
+            "question": f"Which statement about the explained abstraction is correct? ({i + 1})",
+            "options": [
+                "It has well defined inputs and outputs",
+                "It has no constraints",
+                "It is unrelated to engineering",
+                "It cannot be measured",
+            ],
+            "answer_index": 0,
+            "explanation": "The explanation describes inputs, processing and outputs.",
+        }
+        for i in range(10)
+    ]
+    return json.dumps({"questions": questions, "mcqs": questions})
+
+
+class FakeLLM:
+    """Mimics ChatGroq.invoke() with a fixed base latency plus optional jitter.
+
+    With `tail_rate`, that share of calls takes `tail_latency` instead (a long-tail provider).
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+        tail_rate: float = 0.0,
+        tail_latency: float = 0.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    def invoke(self, prompt: str, **kwargs: Any) -> SimpleNamespace:
+        self.calls += 1
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if self.tail_rate and self._rng.random() < self.tail_rate:
+            delay = self.tail_latency
+        if delay > 0:
+            time.sleep(delay)
+
+        if "Return only the integer percentage" in prompt:
+            content = "90"
+        elif "multiple-choice questions" in prompt:
+            content = _fake_mcqs()
+        else:
+            content = _fake_explanation(prompt)
+
+        input_tokens = len(prompt) // 4
+        output_tokens = len(content) // 4
+        return SimpleNamespace(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
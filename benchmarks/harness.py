@@ -0,0 +1,121 @@
+"""
+Minimal pytest-benchmark style runner shared by the benchmark scripts.
+
+Each case is calibrated with timeit's autorange, timed over several rounds,
+and summarised as per-call min/median/mean in microseconds. Results can be
+saved as a JSON baseline and later runs compared against it: a case whose
+best (min) time slows down by more than the threshold counts as a
+regression and the script exits non-zero. The min is used because it is the
+figure least disturbed by other load on the machine.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class BenchmarkSuite:
+    def __init__(self, name: str, baseline_path: str):
+        self.name = name
+        self.baseline_path = baseline_path
+        self._cases: List[Tuple[str, Callable[[], object]]] = []
+
+    def add(self, name: str, fn: Callable[[], object]) -> None:
+        self._cases.append((name, fn))
+
+    def case(self, name: str) -> Callable[[Callable[[], object]], Callable[[], object]]:
+        def decorator(fn: Callable[[], object]) -> Callable[[], object]:
+            self.add(name, fn)
+            return fn
+
+        return decorator
+
+    def run(self, rounds: int, name_filter: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        results: Dict[str, Dict[str, float]] = {}
+        for name, fn in self._cases:
+            if name_filter and name_filter not in name:
+                continue
+            timer = timeit.Timer(fn)
+            loops, _ = timer.autorange()
+            per_call = [t / loops * 1e6 for t in timer.repeat(repeat=rounds, number=loops)]
+            results[name] = {
+                "min_us": round(min(per_call), 3),
+                "median_us": round(statistics.median(per_call), 3),
+                "mean_us": round(statistics.fmean(per_call), 3),
+                "loops": loops,
+                "rounds": rounds,
+            }
+        return results
+
+    def load_baseline(self) -> Dict[str, Dict[str, float]]:
+        if not os.path.exists(self.baseline_path):
+            return {}
+        with open(self.baseline_path, "r", encoding="utf-8") as fh:
+            return json.load(fh).get("results", {})
+
+    def save_baseline(self, results: Dict[str, Dict[str, float]]) -> None:
+        os.makedirs(os.path.dirname(self.baseline_path), exist_ok=True)
+        payload = {
+            "suite": self.name,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        with open(self.baseline_path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float
+) -> List[str]:
+    """Return the names of cases whose min time regressed by more than `threshold` (0.25 = 25%)."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get("min_us"):
+            continue
+        if current["min_us"] > previous["min_us"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def main(suite: BenchmarkSuite, argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=f"Run the {suite.name} benchmark suite")
+    parser.add_argument("--rounds", type=int, default=7, help="timed rounds per case")
+    parser.add_argument("-k", dest="name_filter", default=None, help="only run cases containing this substring")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {suite.baseline_path}")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed min-time slowdown vs baseline")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write results as JSON here")
+    args = parser.parse_args(argv)
+
+    results = suite.run(args.rounds, args.name_filter)
+    baseline = suite.load_baseline()
+
+    width = max((len(n) for n in results), default=10)
+    print(f"{'case':<{width}}  {'min_us':>12}  {'median_us':>12}  {'base_min':>12}  {'change':>8}")
+    for name, r in results.items():
+        previous = baseline.get(name, {}).get("min_us")
+        change = f"{(r['min_us'] / previous - 1) * 100:+.1f}%" if previous else "-"
+        base_str = f"{previous:.3f}" if previous else "-"
+        print(f"{name:<{width}}  {r['min_us']:>12.3f}  {r['median_us']:>12.3f}  {base_str:>12}  {change:>8}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        suite.save_baseline(results)
+        print(f"\nBaseline saved to {suite.baseline_path}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressions above {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,251 @@
+"""
+End-to-end load test for the FastAPI learning flow (backend/main.py).
+
+Each simulated student walks the real user journey:
+    register -> token -> explain -> generate-quiz -> evaluate -> reteach (on fail) / next topic -> progress
+
+By default the app runs in-process against an in-memory Mongo stand-in and a
+fake LLM, so runs are reproducible and cost no tokens. Pass --base-url to
+drive a deployed instance instead.
+
+Usage:
+    python benchmarks/loadtest.py --users 20 --topics 3 --llm-latency 0.5 --output run.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(BENCH_DIR, "..", "backend")
+
+TOPICS = [
+    "Artificial Intelligence",
+    "Machine Learning",
+    "Deep Learning",
+    "Neural Networks",
+    "Natural Language Processing",
+    "Computer Vision",
+    "Reinforcement Learning",
+    "Generative AI",
+    "Transformers",
+    "Diffusion Models",
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, endpoint: str, seconds: float, ok: bool) -> None:
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def report(self, wall_seconds: float) -> Dict[str, Dict[str, float]]:
+        endpoints = {}
+        all_latencies: List[float] = []
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            all_latencies.extend(values)
+            endpoints[endpoint] = _summary(values, self.errors[endpoint], wall_seconds)
+        total = _summary(sorted(all_latencies), sum(self.errors.values()), wall_seconds)
+        return {"endpoints": endpoints, "total": total}
+
+
+def _summary(values: List[float], errors: int, wall_seconds: float) -> Dict[str, float]:
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "throughput_rps": round(count / wall_seconds, 3) if wall_seconds else 0.0,
+        "mean_ms": round(1000 * sum(values) / count, 2) if count else 0.0,
+        "p50_ms": round(1000 * percentile(values, 50), 2),
+        "p95_ms": round(1000 * percentile(values, 95), 2),
+        "p99_ms": round(1000 * percentile(values, 99), 2),
+        "max_ms": round(1000 * values[-1], 2) if count else 0.0,
+    }
+
+
+async def _request(client: httpx.AsyncClient, recorder: Recorder, endpoint: str, method: str, url: str, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        recorder.add(endpoint, time.perf_counter() - started, ok=False)
+        return None
+    recorder.add(endpoint, time.perf_counter() - started, ok=response.status_code < 400)
+    return response if response.status_code < 400 else None
+
+
+async def _think(args: argparse.Namespace, rng: random.Random) -> None:
+    if args.think_max > 0:
+        await asyncio.sleep(rng.uniform(args.think_min, args.think_max))
+
+
+async def student(client: httpx.AsyncClient, recorder: Recorder, args: argparse.Namespace, seed: int) -> None:
+    rng = random.Random(seed)
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    password = "loadtest-password"
+
+    if await _request(client, recorder, "register", "POST", "/register", json={"email": email, "password": password}) is None:
+        return
+    token_response = await _request(
+        client, recorder, "token", "POST", "/token", data={"username": email, "password": password}
+    )
+    if token_response is None:
+        return
+    headers = {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+
+    start = rng.randrange(len(TOPICS))
+    topics = [TOPICS[(start + i) % len(TOPICS)] for i in range(args.topics)]
+    for topic in topics:
+        await _think(args, rng)
+        if await _request(client, recorder, "explain", "POST", "/explain", json={"topic": topic}, headers=headers) is None:
+            continue
+
+        for _attempt in range(3):
+            await _think(args, rng)
+            quiz = await _request(
+                client, recorder, "generate-quiz", "POST", "/generate-quiz", json={"topic": topic}, headers=headers
+            )
+            if quiz is None:
+                break
+            correct_answers = [q["answer_index"] for q in quiz.json()["questions"]]
+            answers = [a if rng.random() < args.pass_rate else (a + 1) % 4 for a in correct_answers]
+
+            await _think(args, rng)
+            result = await _request(
+                client,
+                recorder,
+                "evaluate",
+                "POST",
+                "/evaluate",
+                json={"topic": topic, "answers": answers, "correct_answers": correct_answers},
+                headers=headers,
+            )
+            if result is None:
+                break
+            body = result.json()
+            if body["score"] >= 70 or body["max_attempts_reached"]:
+                break
+
+            await _think(args, rng)
+            await _request(client, recorder, "reteach", "POST", "/reteach", json={"topic": topic}, headers=headers)
+
+    await _think(args, rng)
+    await _request(client, recorder, "progress", "GET", "/progress", headers=headers)
+
+
+def _in_process_app(args: argparse.Namespace):
+    """Import backend/main.py wired to the in-memory database and fake LLM."""
+    sys.path.insert(0, BENCH_DIR)
+    sys.path.insert(0, os.path.abspath(BACKEND_DIR))
+    from fakes import FakeLLM, InMemoryDatabase
+
+    import database
+
+    database.database = InMemoryDatabase()
+
+    import main
+
+    main.context_manager._llm = FakeLLM(
+        latency=args.llm_latency,
+        jitter=args.llm_jitter,
+        seed=args.seed,
+        tail_rate=args.llm_tail_rate,
+        tail_latency=args.llm_tail_latency,
+    )
+    return main.app
+
+
+async def run(args: argparse.Namespace) -> Dict[str, object]:
+    if args.base_url:
+        transport: Optional[httpx.AsyncBaseTransport] = None
+        base_url = args.base_url
+    else:
+        transport = httpx.ASGITransport(app=_in_process_app(args))
+        base_url = "http://loadtest"
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        started = time.perf_counter()
+        tasks = []
+        for i in range(args.users):
+            tasks.append(asyncio.create_task(student(client, recorder, args, seed=args.seed + i)))
+            if args.ramp_up > 0:
+                await asyncio.sleep(args.ramp_up / args.users)
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - started
+
+    report = recorder.report(wall)
+    report["config"] = {
+        "users": args.users,
+        "topics": args.topics,
+        "think_min": args.think_min,
+        "think_max": args.think_max,
+        "pass_rate": args.pass_rate,
+        "llm_latency": args.llm_latency,
+        "llm_jitter": args.llm_jitter,
+        "llm_tail_rate": args.llm_tail_rate,
+        "llm_tail_latency": args.llm_tail_latency,
+        "seed": args.seed,
+        "target": args.base_url or "in-process",
+    }
+    report["wall_seconds"] = round(wall, 3)
+    return report
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the learning flow of backend/main.py")
+    parser.add_argument("--users", type=int, default=10, help="concurrent simulated students")
+    parser.add_argument("--topics", type=int, default=2, help="topics each student works through")
+    parser.add_argument("--think-min", type=float, default=0.0, help="minimum think time between steps (s)")
+    parser.add_argument("--think-max", type=float, default=0.0, help="maximum think time between steps (s)")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds over which students are started")
+    parser.add_argument("--pass-rate", type=float, default=0.7, help="probability of answering a question right")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="fake LLM latency per call (s)")
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="extra uniform random fake LLM latency (s)")
+    parser.add_argument("--llm-tail-rate", type=float, default=0.0, help="share of fake LLM calls that are slow")
+    parser.add_argument("--llm-tail-latency", type=float, default=0.0, help="latency of those slow calls (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request client timeout (s)")
+    parser.add_argument("--base-url", default=None, help="drive a running server instead of the in-process app")
+    parser.add_argument("--output", default=None, help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,3 +20,25 @@ CHECKPOINTS = [
         "pass_score": 70
     }
 ]
+
+# Curriculum offered in the Streamlit app (app.py), in learning order.
+# Prerequisites make it a DAG (see graph.CurriculumGraph); pass_score is the mastery threshold.
+CURRICULUM = [
+    {"topic": "Artificial Intelligence", "prerequisites": [], "pass_score": 70},
+    {"topic": "Machine Learning", "prerequisites": ["Artificial Intelligence"], "pass_score": 70},
+    {"topic": "Deep Learning", "prerequisites": ["Machine Learning"], "pass_score": 70},
+    {"topic": "Natural Language Processing", "prerequisites": ["Deep Learning"], "pass_score": 70},
+    {"topic": "Computer Vision", "prerequisites": ["Deep Learning"], "pass_score": 70},
+    {"topic": "Reinforcement Learning", "prerequisites": ["Machine Learning"], "pass_score": 70},
+    {"topic": "Data Structures and Algorithms", "prerequisites": [], "pass_score": 70},
+    {"topic": "Cloud Computing", "prerequisites": [], "pass_score": 70},
+    {
+        "topic": "Distributed Systems",
+        "prerequisites": ["Cloud Computing", "Data Structures and Algorithms"],
+        "pass_score": 70,
+    },
+    {"topic": "Cybersecurity Basics", "prerequisites": ["Distributed Systems"], "pass_score": 70},
+]
+
+# Checkpoint topics offered in the Streamlit app (app.py), in learning order
+CHECKPOINT_TOPICS = [cp["topic"] for cp in CURRICULUM]
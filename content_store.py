@@ -0,0 +1,143 @@
+"""
+content_store.py
+
+Shared memo for generated learning content (explanations, MCQs, relevance
+scores, Feynman re-teaching) used by the Streamlit app.
+
+- Keys are plain tuples, e.g. ("context", prompt version, topic) or
+  ("mcqs", prompt version, topic, difficulty, digest, variant).
+- Each entry is a Future, so concurrent callers asking for the same key wait
+  for one generation instead of starting their own (single-flight).
+- Failed generations are dropped so the next caller retries.
+- Entries expire after `ttl_seconds`, and the store keeps at most `max_entries`
+  (least recently used evicted first). Values the `is_fallback` predicate flags
+  (rate-limit/error fallback text) expire after `fallback_ttl_seconds` instead,
+  so the next caller retries the LLM soon after it recovers.
+- prefetch() warms a key on a small background pool; a later get() for the same
+  key joins the in-flight generation or returns the finished value.
+- start() does the same for results the user is already waiting for (shown as
+  soon as they are ready), on a pool of its own, so they never queue behind
+  speculative prefetches.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def digest(text: str) -> str:
+    """Short stable fingerprint for long source texts used inside cache keys."""
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()[:16]
+
+
+class ContentStore:
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 6 * 3600,
+        prefetch_workers: int = 2,
+        foreground_workers: int = 2,
+        fallback_ttl_seconds: float = 60,
+        is_fallback: Optional[Callable[[Any], bool]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.prefetch_workers = prefetch_workers
+        self.foreground_workers = foreground_workers
+        self.fallback_ttl_seconds = fallback_ttl_seconds
+        self._is_fallback = is_fallback
+        self._entries: "OrderedDict[Hashable, Tuple[Future, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # "prefetch" and "foreground" pools, created on first use
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+
+    def _lookup(self, key: Hashable) -> Optional[Future]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        future, created = entry
+        if future.done() and time.monotonic() - created > self._ttl(future):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return future
+
+    def _ttl(self, future: Future) -> float:
+        if self._is_fallback is not None and future.exception() is None and self._is_fallback(future.result()):
+            return self.fallback_ttl_seconds
+        return self.ttl_seconds
+
+    def _insert(self, key: Hashable, future: Future) -> None:
+        self._entries[key] = (future, time.monotonic())
+        while len(self._entries) > self.max_entries:
+            oldest_key, (oldest, _created) = next(iter(self._entries.items()))
+            if not oldest.done():
+                # never evict in-flight work; it would be regenerated by the waiter
+                self._entries.move_to_end(oldest_key)
+                break
+            del self._entries[oldest_key]
+
+    def _forget(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is future:
+                del self._entries[key]
+
+    def peek(self, key: Hashable) -> Optional[Future]:
+        """Return the entry for `key` (pending or done) without generating anything."""
+        with self._lock:
+            return self._lookup(key)
+
+    def get(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Return the cached value for `key`, computing it with fn(*args, **kwargs) on a miss."""
+        with self._lock:
+            future = self._lookup(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                future.set_running_or_notify_cancel()
+                self._insert(key, future)
+
+        if owner:
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as exc:
+                future.set_exception(exc)
+                self._forget(key, future)
+                raise
+        return future.result()
+
+    def _pool(self, lane: str) -> ThreadPoolExecutor:
+        with self._lock:
+            executor = self._executors.get(lane)
+            if executor is None:
+                workers = self.prefetch_workers if lane == "prefetch" else self.foreground_workers
+                executor = self._executors[lane] = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix=f"content-{lane}"
+                )
+            return executor
+
+    def _get_quietly(self, key: Hashable, fn: Callable[..., Any], args, kwargs) -> None:
+        try:
+            self.get(key, fn, *args, **kwargs)
+        except Exception as exc:
+            print(f"Warning: background generation of {key[0]!r} failed: {exc}")
+
+    def prefetch(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """Start generating `key` in the background unless it is already cached or in flight."""
+        if self.peek(key) is not None:
+            return
+        self._pool("prefetch").submit(self._get_quietly, key, fn, args, kwargs)
+
+    def start(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """Like prefetch(), for a result the user is waiting for: runs on the foreground pool."""
+        if self.peek(key) is not None:
+            return
+        self._pool("foreground").submit(self._get_quietly, key, fn, args, kwargs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
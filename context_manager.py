@@ -7,6 +7,7 @@ Core LLM helpers for the Autonomous Learning Agent.
 - MCQ generation (10 per topic, 4 options, single correct)
 - Relevance scoring between explanation and MCQs
 - Feynman-style re-teaching
+- Precomputed content packs (CONTENT_PACK_PATH) served before any LLM call
 
 LangGraph-style note:
 - The Streamlit app uses explicit stage/state transitions (teach -> quiz -> score -> feynman)
@@ -15,41 +16,98 @@ LangGraph-style note:
   into LangChain runnables (kept minimal here for demo safety).
 """
 
+import importlib.util
 import json
 import os
 import re
+import threading
 from dotenv import load_dotenv
 
-# =============================
-# Groq client (safe import)
-# =============================
-try:
-    from langchain_groq import ChatGroq
-except ModuleNotFoundError:
-    ChatGroq = None
+from backend.circuit_breaker import CircuitOpenError, llm_circuit
+from backend.content_pack import load_content_pack
+from backend.hedging import llm_hedger
+from backend.llm import shared_http_client
+from backend.prompts import EXPLAIN, QUIZ, QUIZ_DIFFICULTY, RELEVANCE, RETEACH
 
-# Load env from local .env (project root preferred)
-env_loaded = load_dotenv()
-if not env_loaded:
-    load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
+# Load env from local .env (find_dotenv walks up from this file, so one call is enough)
+load_dotenv()
 
 # Groq credentials + default model
 api_key = os.getenv("GROQ_API_KEY")
 groq_model = os.getenv("GROQ_MODEL") or "llama-3.1-8b-instant"
 
+
 # =============================
-# LLM init with safe fallback
+# Groq client (lazy, safe import)
 # =============================
-llm = None
-if api_key and ChatGroq is not None:
-    llm = ChatGroq(
-        model=groq_model,
-        temperature=0.3,
-        groq_api_key=api_key,
-    )
+# langchain_groq pulls in most of LangChain, so it is imported and the client
+# built on the first LLM call instead of at module import. HTTP connections come
+# from the pool shared with the backend's client layer (keep-alive, tunable limits).
+_llm = None
+_llm_lock = threading.Lock()
+llm_configured = bool(api_key) and importlib.util.find_spec("langchain_groq") is not None
+
+
+def get_llm():
+    """Return the shared ChatGroq client, or None when the key/dependency is missing."""
+    global _llm
+    if _llm is None and llm_configured:
+        with _llm_lock:
+            if _llm is None:
+                from langchain_groq import ChatGroq
+
+                _llm = ChatGroq(
+                    model=groq_model,
+                    temperature=0.3,
+                    groq_api_key=api_key,
+                    http_client=shared_http_client(),
+                    # ChatGroq sends its own (default: no) timeout with every request, overriding the pool's
+                    request_timeout=shared_http_client().timeout,
+                )
+    return _llm
+
+
+def _invoke(llm, prompt, operation):
+    """llm.invoke() through the provider circuit breaker (raises CircuitOpenError at once while it is open)
+    and the hedging policy (a duplicate request when `operation` runs past its usual latency)."""
+    return llm_circuit().call(llm_hedger().call, operation, llm.invoke, prompt)
+
+
 # LangSmith hint: set LANGSMITH_* env vars + callbacks to trace LangChain runs.
 
 
+# =============================
+# Content pack (read-only, memory-mapped)
+# =============================
+# Built with `python main.py build-pack`; checkpoint topics found here cost no LLM call.
+# Entries are only served while the pack's prompt version matches the current template.
+content_pack = load_content_pack()
+
+
+def _packed(field, template, topic):
+    if content_pack is None or not content_pack.is_current(template):
+        return None
+    return content_pack.text(topic, field)
+
+
+# =============================
+# Fallback markers
+# =============================
+# Fallback content is returned as these subclasses so callers that cache results
+# (the Streamlit ContentStore) can keep it briefly instead of for the full TTL.
+class FallbackText(str):
+    pass
+
+
+class FallbackMCQs(list):
+    pass
+
+
+def is_fallback(value):
+    """True for fallback explanations/MCQs served instead of generated content."""
+    return isinstance(value, (FallbackText, FallbackMCQs))
+
+
 # =============================
 # Fallback explanations (for offline/demo)
 # =============================
@@ -107,9 +165,13 @@ def _safe_json_load(text: str):
 # Professional explanation (B.Tech level)
 # =============================
 def get_context(topic: str) -> str:
+    packed = _packed("explanation", EXPLAIN, topic)
+    if packed:
+        return packed
     try:
+        llm = get_llm()
         if llm is None:
-            return (
+            return FallbackText(
                 f"API is not configured, so I can't generate an AI explanation right now.\n\n"
                 f"Topic: {topic}\n"
                 "Fix:\n"
@@ -118,20 +180,14 @@ def get_context(topic: str) -> str:
                 "- Restart: `streamlit run app.py`"
             )
 
-        prompt = f"""
-You are a senior engineering instructor. Explain the topic: "{topic}".
-
-Requirements (B.Tech level, production-ready clarity):
-- Audience: B.Tech / technical degree students.
-- Tone: professional, precise, and concise (avoid school-level simplification).
-- Structure with short sections: definition, core concepts, math/notation (if relevant),
-  typical workflow/architecture or pipeline, constraints/performance trade-offs,
-  common misconceptions/pitfalls, and 2 practical engineering/CS examples.
-- Add 3–5 key takeaways as bullet points the learner must retain.
-- Keep it presentation-friendly and focused (about 200–350 words).
-"""
-        response = llm.invoke(prompt)
+        prompt = EXPLAIN.render(topic=topic)
+        response = _invoke(llm, prompt, "explain")
         return response.content.strip()
+    except CircuitOpenError:
+        return FallbackText(
+            "AI service is temporarily unavailable. Showing fallback explanation:\n\n"
+            + _medium_fallback_explanation(topic)
+        )
     except Exception as e:
         error_msg = str(e)
         if "API key" in error_msg or "authentication" in error_msg.lower():
@@ -145,16 +201,94 @@ Requirements (B.Tech level, production-ready clarity):
                 "Try changing the Groq model name in context_manager.py to one of the available Groq models."
             ) from e
         if "RESOURCE_EXHAUSTED" in error_msg or "429" in error_msg:
-            return (
+            return FallbackText(
                 "AI service rate-limited (429). Showing fallback explanation:\n\n"
                 + _medium_fallback_explanation(topic)
             )
-        return (
+        return FallbackText(
             "AI service error occurred. Showing fallback explanation:\n\n"
             + _medium_fallback_explanation(topic)
         )
 
 
+# =============================
+# MCQ helpers (fallback set + validation)
+# =============================
+def _fallback_mcqs(topic, context_text=None):
+    """Demo-ready MCQ set used when the API is missing/unavailable."""
+    basis = (context_text or "").strip()
+    basis_hint = f"Based on the provided explanation: {basis[:160]}..." if basis else "Based on the provided explanation."
+    base = [
+        {
+            "question": f"{basis_hint}\nWhich statement best matches the definition stated for '{topic}'?",
+            "options": [
+                "A precise formal definition used in engineering literature",
+                "A purely opinion-based description with no measurable criteria",
+                "A historical anecdote unrelated to engineering practice",
+                "A marketing slogan without technical meaning",
+            ],
+            "answer_index": 0,
+            "explanation": "Technical topics are typically defined in formal, measurable terms.",
+        },
+        {
+            "question": f"{basis_hint}\nWhich option best represents a core concept mentioned in the explanation?",
+            "options": [
+                "A well-defined model/abstraction",
+                "Astrology-based assumptions",
+                "Random trial without evaluation",
+                "Undefined terminology with no constraints",
+            ],
+            "answer_index": 0,
+            "explanation": "Engineering learning emphasizes abstractions, models, and constraints.",
+        },
+    ]
+    while len(base) < 10:
+        i = len(base) + 1
+        base.append(
+            {
+                "question": f"{basis_hint}\n[Demo] Which option is consistent with what was explained? (Q{i})",
+                "options": [
+                    "Write a small example and test edge cases",
+                    "Memorize a paragraph without applying it",
+                    "Avoid definitions and rely only on intuition",
+                    "Skip evaluation entirely",
+                ],
+                "answer_index": 0,
+                "explanation": "Applying concepts in small experiments and testing is a standard validation approach.",
+            }
+        )
+    return FallbackMCQs(base[:10])
+
+
+def _clean_mcqs(mcqs):
+    """Keep only well-formed MCQs (non-empty question, 4 options, answer index 0-3)."""
+    cleaned = []
+    for item in mcqs:
+        if not isinstance(item, dict):
+            continue
+        q = str(item.get("question", "")).strip()
+        opts = item.get("options", [])
+        ans = item.get("answer_index", None)
+        exp = str(item.get("explanation", "")).strip()
+        if not q or not isinstance(opts, list) or len(opts) != 4:
+            continue
+        try:
+            ans_i = int(ans)
+        except Exception:
+            continue
+        if ans_i < 0 or ans_i > 3:
+            continue
+        cleaned.append(
+            {
+                "question": q,
+                "options": [str(o).strip() for o in opts],
+                "answer_index": ans_i,
+                "explanation": exp,
+            }
+        )
+    return cleaned
+
+
 # =============================
 # MCQ generation (10 Qs, 4 options, 1 correct)
 # =============================
@@ -169,136 +303,70 @@ def generate_mcqs(topic, context_text=None, difficulty="normal"):
         "explanation": str,
       }
     """
-    # Fallback (API missing/unavailable): still return a demo-ready MCQ set.
-    def _fallback():
-        basis = (context_text or "").strip()
-        basis_hint = f"Based on the provided explanation: {basis[:160]}..." if basis else "Based on the provided explanation."
-        base = [
-            {
-                "question": f"{basis_hint}\nWhich statement best matches the definition stated for '{topic}'?",
-                "options": [
-                    "A precise formal definition used in engineering literature",
-                    "A purely opinion-based description with no measurable criteria",
-                    "A historical anecdote unrelated to engineering practice",
-                    "A marketing slogan without technical meaning",
-                ],
-                "answer_index": 0,
-                "explanation": "Technical topics are typically defined in formal, measurable terms.",
-            },
-            {
-                "question": f"{basis_hint}\nWhich option best represents a core concept mentioned in the explanation?",
-                "options": [
-                    "A well-defined model/abstraction",
-                    "Astrology-based assumptions",
-                    "Random trial without evaluation",
-                    "Undefined terminology with no constraints",
-                ],
-                "answer_index": 0,
-                "explanation": "Engineering learning emphasizes abstractions, models, and constraints.",
-            },
-        ]
-        while len(base) < 10:
-            i = len(base) + 1
-            base.append(
-                {
-                    "question": f"{basis_hint}\n[Demo] Which option is consistent with what was explained? (Q{i})",
-                    "options": [
-                        "Write a small example and test edge cases",
-                        "Memorize a paragraph without applying it",
-                        "Avoid definitions and rely only on intuition",
-                        "Skip evaluation entirely",
-                    ],
-                    "answer_index": 0,
-                    "explanation": "Applying concepts in small experiments and testing is a standard validation approach.",
-                }
-            )
-        return base[:10]
-
+    # Pack quizzes are grounded in the pack explanation, so only serve them for that text.
+    if difficulty == "normal" and content_pack is not None and content_pack.is_current(QUIZ):
+        packed_explanation = content_pack.explanation(topic)
+        if packed_explanation and (context_text is None or context_text.strip() == packed_explanation.strip()):
+            packed = _clean_mcqs(content_pack.quiz(topic) or [])
+            if len(packed) == 10:
+                return packed
     try:
+        llm = get_llm()
         if llm is None:
-            return _fallback()
+            return _fallback_mcqs(topic, context_text)
 
         explanation_basis = (context_text or "").strip()
         if not explanation_basis:
-            return _fallback()
-        difficulty_line = (
-            "Keep questions medium difficulty (B.Tech level)."
-            if difficulty == "normal"
-            else "Keep questions EASY and direct (based only on the explanation)."
-        )
-
-        prompt = f"""
-You MUST generate MCQs ONLY from the explanation text provided below. Do NOT use outside facts.
-
-Topic: "{topic}"
-
-Explanation text (the ONLY source):
-\"\"\"{explanation_basis}\"\"\"
-
-Task: Generate EXACTLY 10 multiple-choice questions (MCQs) derived ONLY from the explanation text.
-
-Rules:
-- Exactly 10 questions.
-- Each question MUST have exactly 4 options.
-- Only ONE option is correct.
-- {difficulty_line}
-- Avoid ambiguous wording.
-- Do not ask anything that is not explicitly stated or clearly implied in the explanation text.
-- Keep terminology consistent with the explanation to maximize relevance/traceability.
-
-Return STRICT JSON ONLY (no markdown, no extra text) in this schema:
-{{
-  "mcqs": [
-    {{
-      "question": "string",
-      "options": ["string", "string", "string", "string"],
-      "answer_index": 0,
-      "explanation": "string"
-    }}
-  ]
-}}
-"""
-        response = llm.invoke(prompt)
+            return _fallback_mcqs(topic, context_text)
+        difficulty_line = QUIZ_DIFFICULTY["normal" if difficulty == "normal" else "easy"]
+        prompt = QUIZ.render(topic=topic, explanation=explanation_basis, difficulty_line=difficulty_line)
+        response = _invoke(llm, prompt, "quiz")
         raw = response.content.strip()
         json_blob = _extract_json_object(raw)
         data = _safe_json_load(json_blob) if json_blob else None
 
         mcqs = (data or {}).get("mcqs") if isinstance(data, dict) else None
         if not isinstance(mcqs, list):
-            return _fallback()
-
-        cleaned = []
-        for item in mcqs:
-            if not isinstance(item, dict):
-                continue
-            q = str(item.get("question", "")).strip()
-            opts = item.get("options", [])
-            ans = item.get("answer_index", None)
-            exp = str(item.get("explanation", "")).strip()
-            if not q or not isinstance(opts, list) or len(opts) != 4:
-                continue
-            try:
-                ans_i = int(ans)
-            except Exception:
-                continue
-            if ans_i < 0 or ans_i > 3:
-                continue
-            cleaned.append(
-                {
-                    "question": q,
-                    "options": [str(o).strip() for o in opts],
-                    "answer_index": ans_i,
-                    "explanation": exp,
-                }
-            )
+            return _fallback_mcqs(topic, context_text)
 
+        cleaned = _clean_mcqs(mcqs)
         if len(cleaned) != 10:
-            return _fallback()
+            return _fallback_mcqs(topic, context_text)
         return cleaned
 
     except Exception as e:
         print(f"Warning: MCQ generation failed: {e}")
-        return _fallback()
+        return _fallback_mcqs(topic, context_text)
+
+
+# =============================
+# Lexical relevance (offline fallback)
+# =============================
+def _tokenize(text):
+    return {w for w in re.findall(r"[A-Za-z0-9]+", text.lower()) if len(w) > 3}
+
+
+def _lexical_relevance_score(explanation, mcqs):
+    """Token-overlap estimate of how grounded the MCQs are in the explanation."""
+    explanation_tokens = _tokenize(explanation)
+    if not explanation_tokens:
+        return 50
+
+    overlaps = []
+    for q in mcqs:
+        question_text = q.get("question", "")
+        opts = " ".join(q.get("options", []))
+        mcq_tokens = _tokenize(question_text + " " + opts)
+        if not mcq_tokens:
+            continue
+        overlap = len(mcq_tokens & explanation_tokens) / max(1, len(mcq_tokens))
+        overlaps.append(overlap)
+
+    if not overlaps:
+        return 50
+
+    avg_overlap = sum(overlaps) / len(overlaps)
+    return max(0, min(100, int((0.35 + avg_overlap) * 100)))
 
 
 # =============================
@@ -314,6 +382,7 @@ def compute_relevance_score(explanation: str, mcqs) -> int:
         return 0
 
     # Prefer LLM-based judgment
+    llm = get_llm()
     if llm is not None:
         try:
             formatted_mcqs = "\n".join(
@@ -322,20 +391,8 @@ def compute_relevance_score(explanation: str, mcqs) -> int:
                     for i, q in enumerate(mcqs[:10])
                 ]
             )
-            prompt = f"""
-Evaluate how well these MCQs are grounded ONLY in the provided explanation.
-Return one integer 0-100 representing the percentage of questions that can be
-answered directly from the explanation text.
-
-Explanation:
-\"\"\"{explanation}\"\"\"
-
-MCQs:
-{formatted_mcqs}
-
-Return only the integer percentage (no words).
-"""
-            response = llm.invoke(prompt)
+            prompt = RELEVANCE.render(explanation=explanation, mcqs=formatted_mcqs)
+            response = _invoke(llm, prompt, "relevance")
             digits = "".join(filter(str.isdigit, response.content))
             if digits:
                 score = int(digits)
@@ -343,29 +400,7 @@ Return only the integer percentage (no words).
         except Exception as exc:
             print(f"Warning: relevance scoring via LLM failed: {exc}")
 
-    # Lexical overlap fallback
-    def _tokenize(text):
-        return {w for w in re.findall(r"[A-Za-z0-9]+", text.lower()) if len(w) > 3}
-
-    explanation_tokens = _tokenize(explanation)
-    if not explanation_tokens:
-        return 50
-
-    overlaps = []
-    for q in mcqs:
-        question_text = q.get("question", "")
-        opts = " ".join(q.get("options", []))
-        mcq_tokens = _tokenize(question_text + " " + opts)
-        if not mcq_tokens:
-            continue
-        overlap = len(mcq_tokens & explanation_tokens) / max(1, len(mcq_tokens))
-        overlaps.append(overlap)
-
-    if not overlaps:
-        return 50
-
-    avg_overlap = sum(overlaps) / len(overlaps)
-    return max(0, min(100, int((0.35 + avg_overlap) * 100)))
+    return _lexical_relevance_score(explanation, mcqs)
 
 
 # =============================
@@ -373,6 +408,7 @@ Return only the integer percentage (no words).
 # =============================
 def evaluate_answer(user_answer, topic):
     try:
+        llm = get_llm()
         prompt = f"""
         Topic: {topic}
 
@@ -382,7 +418,7 @@ def evaluate_answer(user_answer, topic):
         Give a score out of 100 based on correctness.
         Only return the number.
         """
-        response = llm.invoke(prompt)
+        response = _invoke(llm, prompt, "evaluate")
         score = int("".join(filter(str.isdigit, response.content)))
         return score
     except Exception as e:
@@ -400,29 +436,24 @@ def evaluate_answer(user_answer, topic):
 # Feynman re-teaching
 # =============================
 def feynman_explanation(topic):
+    packed = _packed("reteach", RETEACH, topic)
+    if packed:
+        return packed
     try:
+        llm = get_llm()
         if llm is None:
-            return (
+            return FallbackText(
                 f"API is not configured, so I can't generate a Feynman re-explanation right now.\n\n"
                 f"Topic: {topic}\n"
                 "Add `GROQ_API_KEY` in a `.env` file and restart the app."
             )
 
-        prompt = f"""
-Re-teach the topic "{topic}" in a VERY SIMPLE way (Feynman style) without losing technical correctness.
-
-Rules:
-- Use short sentences and simple words.
-- Start with a 1–2 line intuition.
-- Then explain the core idea in 5–10 bullet points.
-- Include 2 engineering/CS examples (e.g., networking, OS, databases, software architecture).
-- End with 3 short self-check questions the student should be able to answer.
-"""
-        response = llm.invoke(prompt)
+        prompt = RETEACH.render(topic=topic)
+        response = _invoke(llm, prompt, "reteach")
         return response.content.strip()
     except Exception as e:
         error_msg = str(e)
         if "API key" in error_msg or "authentication" in error_msg.lower():
             print(f"Warning: API authentication failed: {error_msg}")
             print("Falling back to default explanation.")
-        return _very_simple_fallback_explanation(topic)
+        return FallbackText(_very_simple_fallback_explanation(topic))
@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { useNavigate } from 'react-router-dom';
+import { useLocation, useNavigate } from 'react-router-dom';
 import { api } from '../context/AuthContext';
 import Sidebar from '../components/Sidebar';
 import Card from '../components/Card';
@@ -7,7 +7,8 @@ import Button from '../components/Button';
 
 export default function LearnPage() {
     const navigate = useNavigate();
-    const [selectedTopic, setSelectedTopic] = useState('');
+    const location = useLocation();
+    const [selectedTopic, setSelectedTopic] = useState(location.state?.topic || '');
     const [explanation, setExplanation] = useState('');
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState('');
@@ -35,7 +36,7 @@ export default function LearnPage() {
         setError('');
         setLoading(true);
         try {
-            const response = await api.post('/explain', { topic: selectedTopic });
+            const response = await api.get('/explain', { params: { topic: selectedTopic } });
             setExplanation(response.data.explanation);
             setShowQuiz(false);
         } catch (err) {
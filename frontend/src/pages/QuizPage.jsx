@@ -74,6 +74,7 @@ export default function QuizPage() {
                     score: response.data.score,
                     attemptNumber: response.data.attempt_number,
                     maxAttemptsReached: response.data.max_attempts_reached,
+                    nextTopic: response.data.next_topic,
                     topic
                 }
             });
@@ -9,7 +9,7 @@ import Button from '../components/Button';
 export default function ResultPage() {
     const location = useLocation();
     const navigate = useNavigate();
-    const { score, attemptNumber, maxAttemptsReached, topic } = location.state || {};
+    const { score, attemptNumber, maxAttemptsReached, nextTopic, topic } = location.state || {};
 
     const [reteachExplanation, setReteachExplanation] = useState('');
     const [loading, setLoading] = useState(false);
@@ -25,7 +25,7 @@ export default function ResultPage() {
     const fetchReteach = async () => {
         setLoading(true);
         try {
-            const response = await api.post('/reteach', { topic });
+            const response = await api.get('/reteach', { params: { topic } });
             setReteachExplanation(response.data.simplified_explanation);
         } catch (err) {
             console.error('Failed to fetch reteach:', err);
@@ -38,7 +38,7 @@ export default function ResultPage() {
         // Get the explanation again for the same topic
         setLoading(true);
         try {
-            const response = await api.post('/explain', { topic });
+            const response = await api.get('/explain', { params: { topic } });
             const explanation = response.data.explanation;
 
             // Navigate directly to quiz with topic and explanation
@@ -53,7 +53,8 @@ export default function ResultPage() {
     };
 
     const handleNextTopic = () => {
-        navigate('/learn');
+        // The backend is already generating the next topic's explanation
+        navigate('/learn', { state: { topic: nextTopic } });
     };
 
     if (!topic) {
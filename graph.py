@@ -0,0 +1,178 @@
+"""
+graph.py
+
+Curriculum graph for the Streamlit learning flow.
+
+- CurriculumGraph: DAG of topics with prerequisites and per-topic mastery
+  thresholds. Adjacency, a topological order (stable w.r.t. the declared
+  order) and the next-topic table are computed once, so lookups are O(1).
+- PrefetchPlanner: tracks where each active learner is and warms content for
+  the nodes they are most likely to visit next (next in order + newly
+  unlocked dependents), most-demanded first.
+"""
+
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+DEFAULT_MASTERY = 70
+
+
+@dataclass(frozen=True)
+class TopicNode:
+    topic: str
+    prerequisites: Tuple[str, ...] = ()
+    mastery_threshold: int = DEFAULT_MASTERY
+
+
+class CurriculumGraph:
+    def __init__(self, nodes: Sequence[TopicNode]):
+        self._nodes: Dict[str, TopicNode] = {}
+        for node in nodes:
+            if node.topic in self._nodes:
+                raise ValueError(f"Duplicate curriculum topic: {node.topic!r}")
+            self._nodes[node.topic] = node
+
+        children: Dict[str, List[str]] = {topic: [] for topic in self._nodes}
+        for node in self._nodes.values():
+            for prereq in node.prerequisites:
+                if prereq not in self._nodes:
+                    raise ValueError(f"{node.topic!r} depends on unknown topic {prereq!r}")
+                children[prereq].append(node.topic)
+        self._children = {topic: tuple(kids) for topic, kids in children.items()}
+
+        self.order: Tuple[str, ...] = self._topological_order()
+        self._position = {topic: i for i, topic in enumerate(self.order)}
+        self._next = {a: b for a, b in zip(self.order, self.order[1:])}
+
+    @classmethod
+    def from_dicts(cls, items: Iterable[dict]) -> "CurriculumGraph":
+        """Build from checkpoint dicts: {"topic", "prerequisites"?, "pass_score"?}."""
+        return cls(
+            [
+                TopicNode(
+                    topic=item["topic"],
+                    prerequisites=tuple(item.get("prerequisites", ())),
+                    mastery_threshold=int(item.get("pass_score", DEFAULT_MASTERY)),
+                )
+                for item in items
+            ]
+        )
+
+    def _topological_order(self) -> Tuple[str, ...]:
+        # Kahn's algorithm; among ready topics the earliest declared goes first.
+        declared = {topic: i for i, topic in enumerate(self._nodes)}
+        indegree = {topic: len(node.prerequisites) for topic, node in self._nodes.items()}
+        ready = sorted((t for t, d in indegree.items() if d == 0), key=declared.__getitem__)
+        order: List[str] = []
+        while ready:
+            topic = ready.pop(0)
+            order.append(topic)
+            for child in self._children[topic]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+            ready.sort(key=declared.__getitem__)
+        if len(order) != len(self._nodes):
+            cyclic = sorted(t for t, d in indegree.items() if d > 0)
+            raise ValueError(f"Curriculum has a prerequisite cycle among: {', '.join(cyclic)}")
+        return tuple(order)
+
+    def __contains__(self, topic: object) -> bool:
+        return topic in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def prerequisites(self, topic: str) -> Tuple[str, ...]:
+        node = self._nodes.get(topic)
+        return node.prerequisites if node else ()
+
+    def dependents(self, topic: str) -> Tuple[str, ...]:
+        return self._children.get(topic, ())
+
+    def threshold(self, topic: str) -> int:
+        """Mastery score needed to pass `topic` (free-search topics use the default)."""
+        node = self._nodes.get(topic)
+        return node.mastery_threshold if node else DEFAULT_MASTERY
+
+    def has_mastered(self, topic: str, score: int) -> bool:
+        return score >= self.threshold(topic)
+
+    def next_topic(self, topic: str) -> Optional[str]:
+        """Topic after `topic` in curriculum order, or None at the end / off the graph."""
+        return self._next.get(topic)
+
+    def is_unlocked(self, topic: str, mastered: Set[str]) -> bool:
+        return all(p in mastered for p in self.prerequisites(topic))
+
+    def likely_next(self, topic: str, mastered: Iterable[str] = (), limit: int = 2) -> List[str]:
+        """Topics a learner on `topic` will most likely open next, assuming they pass it."""
+        if topic not in self._nodes:
+            return []
+        done = set(mastered) | {topic}
+        candidates: List[str] = []
+        following = self._next.get(topic)
+        if following and following not in done:
+            candidates.append(following)
+        unlocked = [
+            child
+            for child in self._children[topic]
+            if child not in done and child not in candidates and self.is_unlocked(child, done)
+        ]
+        candidates.extend(sorted(unlocked, key=self._position.__getitem__))
+        return candidates[:limit]
+
+
+class PrefetchPlanner:
+    """
+    Warms content for the likely next curriculum nodes of every active learner.
+
+    `warm(topic)` must be cheap and idempotent (e.g. ContentStore.prefetch);
+    learners idle for longer than `learner_ttl` seconds stop counting towards demand.
+    """
+
+    def __init__(
+        self,
+        graph: CurriculumGraph,
+        warm: Callable[[str], None],
+        fanout: int = 2,
+        learner_ttl: float = 3600.0,
+    ):
+        self.graph = graph
+        self.warm = warm
+        self.fanout = fanout
+        self.learner_ttl = learner_ttl
+        self._learners: Dict[str, Tuple[str, Tuple[str, ...], float]] = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        stale = [lid for lid, (_t, _n, seen) in self._learners.items() if now - seen > self.learner_ttl]
+        for lid in stale:
+            del self._learners[lid]
+
+    def demand(self) -> Counter:
+        """How many active learners are likely to open each topic next."""
+        with self._lock:
+            self._prune(time.monotonic())
+            return Counter(t for _topic, nexts, _seen in self._learners.values() for t in nexts)
+
+    def update(self, learner_id: str, topic: str, mastered: Iterable[str] = ()) -> List[str]:
+        """Record the learner's position and warm their likely next topics; returns those topics."""
+        targets = self.graph.likely_next(topic, mastered, limit=self.fanout)
+        with self._lock:
+            now = time.monotonic()
+            self._learners[learner_id] = (topic, tuple(targets), now)
+            self._prune(now)
+            counts = Counter(t for _topic, nexts, _seen in self._learners.values() for t in nexts)
+        # most-demanded first, so shared destinations are started before niche ones
+        targets.sort(key=lambda t: -counts[t])
+        for target in targets:
+            self.warm(target)
+        return targets
+
+    def forget(self, learner_id: str) -> None:
+        with self._lock:
+            self._learners.pop(learner_id, None)
@@ -0,0 +1,242 @@
+"""
+learning_session.py
+
+Resumable learning-session engine for the Streamlit app (LangGraph-style).
+
+- The flow is an explicit graph of nodes: teach -> quiz -> score -> (pass: next topic | fail: feynman -> quiz)
+- All state a node produces (topic, explanation, current quiz, attempt, answers,
+  score, Feynman text, mastered topics) lives in one SessionState
+- After every step the state is checkpointed to SQLite, so a refresh or reconnect
+  resumes exactly where the learner left off: persisted content is reused, never regenerated
+- Checkpoints live in LEARNING_SESSION_DB (default learning_sessions.db); sessions idle
+  for longer than LEARNING_SESSION_MAX_IDLE_DAYS (default 30) are pruned when the graph
+  is built and whenever a session is resumed
+- Content generation is injected (explain / quiz / reteach callables), so the
+  engine does not care whether it comes from the LLM, a cache or a content pack
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Callable, Dict, List, Optional
+
+MAX_ATTEMPTS = 3
+DEFAULT_MAX_IDLE_DAYS = 30.0
+STAGES = ("start", "teaching", "quiz", "result", "done")
+
+
+@dataclass
+class SessionState:
+    session_id: str
+    stage: str = "start"
+    topic: str = ""
+    attempt: int = 1
+    explanation: str = ""
+    simple_explanation: str = ""
+    mcqs: List[Dict[str, Any]] = field(default_factory=list)
+    answers: List[Optional[int]] = field(default_factory=list)
+    score: Optional[int] = None
+    relevance_score: Optional[int] = None
+    # explanation text the current quiz was generated from (relevance is scored against it)
+    relevance_source: str = ""
+    mastered: List[str] = field(default_factory=list)
+    step: int = 0
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "SessionState":
+        data = json.loads(text)
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+    @property
+    def answered_all(self) -> bool:
+        return bool(self.mcqs) and len(self.answers) == len(self.mcqs) and None not in self.answers
+
+
+# =============================
+# Checkpointer: one row per session, rewritten after each step
+# =============================
+class SQLiteCheckpointer:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("LEARNING_SESSION_DB") or "learning_sessions.db"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return SessionState.from_json(row[0])
+        except (ValueError, TypeError) as exc:
+            print(f"Warning: ignoring unreadable session {session_id}: {exc}")
+            return None
+
+    def save(self, state: SessionState) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                (state.session_id, state.to_json(), time.time()),
+            )
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Delete sessions idle for longer than `max_age_seconds`; returns how many."""
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - max_age_seconds,))
+            return cur.rowcount
+
+
+# =============================
+# Learning graph (nodes + transitions)
+# =============================
+class LearningGraph:
+    def __init__(
+        self,
+        checkpointer: SQLiteCheckpointer,
+        explain: Callable[[str], str],
+        quiz: Callable[[str, str, str, int], List[Dict[str, Any]]],
+        reteach: Callable[[str, int], str],
+        passed: Callable[[str, int], bool] = lambda topic, score: score >= 70,
+        max_attempts: int = MAX_ATTEMPTS,
+        max_idle_seconds: Optional[float] = None,
+    ):
+        self.checkpointer = checkpointer
+        self.explain = explain
+        self.quiz = quiz
+        self.reteach = reteach
+        self.passed = passed
+        self.max_attempts = max_attempts
+        if max_idle_seconds is None:
+            max_idle_seconds = float(os.getenv("LEARNING_SESSION_MAX_IDLE_DAYS") or DEFAULT_MAX_IDLE_DAYS) * 86400
+        self.max_idle_seconds = max_idle_seconds
+        self.prune()
+
+    def prune(self) -> int:
+        """Drop checkpoints idle for longer than `max_idle_seconds` (0 or less keeps them all)."""
+        if self.max_idle_seconds <= 0:
+            return 0
+        try:
+            return self.checkpointer.prune(self.max_idle_seconds)
+        except sqlite3.Error as exc:
+            print(f"Warning: pruning idle sessions failed: {exc}")
+            return 0
+
+    def resume(self, session_id: Optional[str] = None) -> SessionState:
+        """Load the checkpointed session, or start a new one (under `session_id` if given)."""
+        self.prune()
+        if session_id:
+            state = self.checkpointer.load(session_id)
+            if state is not None:
+                return state
+        return SessionState(session_id=session_id or uuid.uuid4().hex)
+
+    def save(self, state: SessionState) -> None:
+        state.step += 1
+        self.checkpointer.save(state)
+
+    # --- nodes ---
+    def _teach(self, state: SessionState) -> None:
+        if not state.explanation:
+            state.explanation = self.explain(state.topic)
+
+    def _make_quiz(self, state: SessionState) -> None:
+        first = state.attempt == 1
+        source = state.explanation if first else state.simple_explanation
+        state.mcqs = self.quiz(state.topic, source, "normal" if first else "easy", state.attempt)
+        state.answers = [None] * len(state.mcqs)
+        state.score = None
+        state.relevance_score = None
+        state.relevance_source = source
+
+    def _score(self, state: SessionState) -> None:
+        correct = sum(1 for q, a in zip(state.mcqs, state.answers) if a == q.get("answer_index"))
+        state.score = int((correct / 10) * 100)
+        if self.passed(state.topic, state.score) and state.topic not in state.mastered:
+            state.mastered.append(state.topic)
+
+    def _feynman(self, state: SessionState) -> None:
+        state.simple_explanation = self.reteach(state.topic, state.attempt)
+
+    # --- transitions (each ends with a checkpoint) ---
+    def start_topic(self, state: SessionState, topic: str) -> SessionState:
+        state.topic = topic
+        state.stage = "teaching"
+        state.attempt = 1
+        state.explanation = ""
+        state.simple_explanation = ""
+        state.mcqs, state.answers = [], []
+        state.score = state.relevance_score = None
+        state.relevance_source = ""
+        self._teach(state)
+        self.save(state)
+        return state
+
+    def start_quiz(self, state: SessionState) -> SessionState:
+        state.attempt = 1
+        self._make_quiz(state)
+        state.stage = "quiz"
+        self.save(state)
+        return state
+
+    def regenerate_quiz(self, state: SessionState) -> SessionState:
+        self._make_quiz(state)
+        self.save(state)
+        return state
+
+    def answer(self, state: SessionState, index: int, choice: Optional[int]) -> SessionState:
+        if 0 <= index < len(state.answers) and state.answers[index] != choice:
+            state.answers[index] = choice
+            self.save(state)
+        return state
+
+    def set_relevance(self, state: SessionState, score: int) -> SessionState:
+        state.relevance_score = score
+        self.save(state)
+        return state
+
+    def submit(self, state: SessionState) -> SessionState:
+        self._score(state)
+        if not self.passed(state.topic, state.score):
+            self._feynman(state)
+        state.stage = "result"
+        self.save(state)
+        return state
+
+    def can_retry(self, state: SessionState) -> bool:
+        return state.attempt < self.max_attempts
+
+    def retry(self, state: SessionState) -> SessionState:
+        state.attempt += 1
+        self._make_quiz(state)
+        state.stage = "quiz"
+        self.save(state)
+        return state
+
+    def reset(self, state: SessionState) -> SessionState:
+        """Back to topic selection; mastered topics are kept."""
+        state.stage = "start"
+        state.topic = ""
+        state.attempt = 1
+        state.explanation = ""
+        state.simple_explanation = ""
+        state.mcqs, state.answers = [], []
+        state.score = state.relevance_score = None
+        state.relevance_source = ""
+        self.save(state)
+        return state
@@ -1,54 +1,94 @@
-from checkpoints import CHECKPOINTS
+import argparse
+
+from checkpoints import CHECKPOINTS, CHECKPOINT_TOPICS
 from context_manager import (
     get_context,
     generate_mcqs,
     feynman_explanation
 )
 
-print("\nAI Autonomous Learning Started\n")
-
-for cp in CHECKPOINTS:
-    print("Checkpoint:", cp["topic"])
-
-    # Step 1: Explanation
-    explanation = get_context(cp["topic"])
-    print("\nAI Explanation:")
-    print(explanation)
-
-    # =============================
-    # UPDATED: MCQ evaluation (10 questions, score out of 100)
-    # =============================
-    print("\nMCQ Evaluation (10 Questions):")
-    mcqs = generate_mcqs(cp["topic"])
-    correct = 0
-
-    for i, q in enumerate(mcqs, start=1):
-        print(f"\nQ{i}. {q['question']}")
-        for opt_idx, opt_text in enumerate(q["options"]):
-            print(f"  {opt_idx + 1}. {opt_text}")
-        while True:
-            try:
-                choice = int(input("Your choice (1-4): ").strip())
-                if choice in (1, 2, 3, 4):
-                    break
-            except Exception:
-                pass
-            print("Please enter a valid option (1-4).")
-
-        if (choice - 1) == q["answer_index"]:
-            correct += 1
-
-    score = int((correct / 10) * 100)
-    print(f"\nYour Score: {score}%")
-
-    if score >= 70:
-        print("✅ Passed! Moving to next checkpoint.")
-    else:
-        print("❌ Failed! Re-explaining using Feynman method.")
-        simple_explanation = feynman_explanation(cp["topic"])
-        print("\nFeynman Explanation:")
-        print(simple_explanation)
 
-    print("\n" + "-" * 50 + "\n")
+def run_interactive():
+    print("\nAI Autonomous Learning Started\n")
+
+    for cp in CHECKPOINTS:
+        print("Checkpoint:", cp["topic"])
+
+        # Step 1: Explanation
+        explanation = get_context(cp["topic"])
+        print("\nAI Explanation:")
+        print(explanation)
+
+        # =============================
+        # UPDATED: MCQ evaluation (10 questions, score out of 100)
+        # =============================
+        print("\nMCQ Evaluation (10 Questions):")
+        mcqs = generate_mcqs(cp["topic"])
+        correct = 0
+
+        for i, q in enumerate(mcqs, start=1):
+            print(f"\nQ{i}. {q['question']}")
+            for opt_idx, opt_text in enumerate(q["options"]):
+                print(f"  {opt_idx + 1}. {opt_text}")
+            while True:
+                try:
+                    choice = int(input("Your choice (1-4): ").strip())
+                    if choice in (1, 2, 3, 4):
+                        break
+                except Exception:
+                    pass
+                print("Please enter a valid option (1-4).")
+
+            if (choice - 1) == q["answer_index"]:
+                correct += 1
+
+        score = int((correct / 10) * 100)
+        print(f"\nYour Score: {score}%")
+
+        if score >= 70:
+            print("✅ Passed! Moving to next checkpoint.")
+        else:
+            print("❌ Failed! Re-explaining using Feynman method.")
+            simple_explanation = feynman_explanation(cp["topic"])
+            print("\nFeynman Explanation:")
+            print(simple_explanation)
 
-print("🎉 Learning Session Completed")
+        print("\n" + "-" * 50 + "\n")
+
+    print("🎉 Learning Session Completed")
+
+
+# =============================
+# Batch mode: offline content-pack builder
+# =============================
+def run_build_pack(args):
+    from pack_builder import build_content_pack
+
+    topics = [cp["topic"] for cp in CHECKPOINTS] + CHECKPOINT_TOPICS + list(args.topic or [])
+    build_content_pack(
+        topics,
+        args.out,
+        variants=args.variants,
+        workers=args.workers,
+        rate_per_minute=args.rate,
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Autonomous Learning Agent (CLI)")
+    sub = parser.add_subparsers(dest="command")
+    build = sub.add_parser("build-pack", help="generate a content pack for every checkpoint, unattended")
+    build.add_argument("--out", default="content_packs", help="directory for versioned packs")
+    build.add_argument("--variants", type=int, default=3, help="quiz variants per topic")
+    build.add_argument("--workers", type=int, default=4, help="concurrent LLM calls")
+    build.add_argument("--rate", type=float, default=30.0, help="max LLM calls per minute (0 = unlimited)")
+    build.add_argument("--topic", action="append", help="extra topic to include (repeatable)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    cli_args = parse_args()
+    if cli_args.command == "build-pack":
+        run_build_pack(cli_args)
+    else:
+        run_interactive()
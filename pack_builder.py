@@ -0,0 +1,155 @@
+"""
+pack_builder.py
+
+Offline batch generation of learning content for a whole curriculum.
+
+For every topic it generates, with a bounded worker pool and a shared rate limit:
+- the professional explanation (get_context)
+- the Feynman re-teaching text (feynman_explanation)
+- N quiz variants derived from the explanation (generate_mcqs)
+
+and writes the result as a versioned content pack, so checkpoint topics can
+be served without LLM calls at request time. Run it via `python main.py build-pack`.
+
+Each version directory holds pack.json (readable, for review/diffs) and
+pack.bin (the memory-mapped format from backend/content_pack.py that the
+apps load via CONTENT_PACK_PATH).
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import context_manager
+from backend.content_pack import write_pack
+from backend.prompts import prompt_set_version, versions
+from backend.topics import canonical_topic
+from context_manager import (
+    feynman_explanation,
+    generate_mcqs,
+    get_context,
+    is_fallback,
+)
+
+PACK_FORMAT = "json-v1"
+
+
+class RateLimiter:
+    """Token bucket shared by all workers: at most `per_minute` calls, bursting up to `burst`."""
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) / self.interval)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.interval
+            time.sleep(wait)
+
+
+def build_content_pack(topics, out_dir, variants=3, workers=4, rate_per_minute=30.0, log=print):
+    """Generate content for `topics` and write `<out_dir>/<version>/pack.{json,bin}`. Returns the pack.bin path."""
+    if not context_manager.llm_configured:
+        raise RuntimeError("GROQ_API_KEY / langchain-groq missing: refusing to build a pack of fallback content.")
+
+    # Regenerate everything from the LLM rather than copying the currently loaded pack.
+    context_manager.content_pack = None
+
+    # one generation per canonical topic ("ML", "What is Machine Learning?" -> "machine learning")
+    by_key = {}
+    for t in topics:
+        if t and t.strip():
+            by_key.setdefault(canonical_topic(t), t.strip())
+    topics = list(by_key.values())
+    limiter = RateLimiter(rate_per_minute, burst=workers)
+    failures = []
+
+    def limited(fn, *args, **kwargs):
+        limiter.acquire()
+        return fn(*args, **kwargs)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pack-builder") as pool:
+        # Phase 1: explanations and Feynman texts are independent of each other.
+        explanation_jobs = {t: pool.submit(limited, get_context, t) for t in topics}
+        reteach_jobs = {t: pool.submit(limited, feynman_explanation, t) for t in topics}
+
+        explanations = {}
+        for topic, job in explanation_jobs.items():
+            text = job.result()
+            # the context_manager helpers never raise, they return FallbackText/FallbackMCQs instead
+            if not text or is_fallback(text):
+                failures.append((topic, "explanation"))
+                continue
+            explanations[topic] = text
+            log(f"[explain] {topic}")
+
+        # Phase 2: quiz variants are grounded in the explanation text.
+        quiz_jobs = {
+            topic: [
+                pool.submit(limited, generate_mcqs, topic, context_text=text, difficulty="normal")
+                for _ in range(variants)
+            ]
+            for topic, text in explanations.items()
+        }
+
+        entries = {}
+        for topic, text in explanations.items():
+            quizzes = []
+            for job in quiz_jobs[topic]:
+                mcqs = job.result()
+                if is_fallback(mcqs):
+                    failures.append((topic, "quiz"))
+                else:
+                    quizzes.append(mcqs)
+            reteach = reteach_jobs[topic].result()
+            if not reteach or is_fallback(reteach):
+                failures.append((topic, "reteach"))
+                reteach = None
+            entries[topic] = {"explanation": text, "reteach": reteach, "quizzes": quizzes}
+            log(f"[quiz] {topic}: {len(quizzes)}/{variants} variants")
+
+    version = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    pack = {
+        "format": PACK_FORMAT,
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "model": context_manager.groq_model,
+        "prompt_version": prompt_set_version(),
+        "prompt_versions": versions(),
+        "variants": variants,
+        "entries": entries,
+        "failures": [{"topic": t, "part": part} for t, part in failures],
+    }
+
+    pack_dir = os.path.join(out_dir, version)
+    os.makedirs(pack_dir, exist_ok=True)
+    path = os.path.join(pack_dir, "pack.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(pack, fh, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+    meta = {k: v for k, v in pack.items() if k not in ("entries", "failures")}
+    path = write_pack(os.path.join(pack_dir, "pack.bin"), entries, {**meta, "format": "alcpack-v1"})
+
+    log(
+        f"Built pack {version}: {len(entries)}/{len(topics)} topics, "
+        f"{len(failures)} failed parts, {time.monotonic() - started:.1f}s -> {path}"
+    )
+    return path